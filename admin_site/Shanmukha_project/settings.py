@@ -19,6 +19,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'hostel.middleware.PerfMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,6 +58,61 @@ DATABASES = {
     }
 }
 
+# Dashboard statistics are cached per process by default. Set HOSTEL_CACHE=file or db to share
+# them between worker processes (the db backend needs `manage.py createcachetable`).
+HOSTEL_CACHE = os.environ.get('HOSTEL_CACHE', 'locmem')
+CACHES = {
+    'default': {
+        'locmem': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'hostel',
+        },
+        'file': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache',
+        },
+        'db': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'hostel_cache',
+        },
+    }[HOSTEL_CACHE]
+}
+HOSTEL_DASHBOARD_CACHE_TIMEOUT = 300
+# Server-side lifetime of the AJAX answers; their ETags change on every write regardless
+HOSTEL_AJAX_CACHE_TIMEOUT = 60
+# Rooms per page of the dues report; further rooms load on demand
+HOSTEL_DUES_PAGE_SIZE = 25
+
+# Payments older than this (and all payments of vacated members) are moved to the archive by
+# `manage.py archive_payments`; balances are unchanged, old history is read through from the archive
+HOSTEL_ARCHIVE_HORIZON_DAYS = 730
+
+# Pub/sub behind the /api/live/ event stream. LocalBroker only reaches this process's subscribers;
+# use hostel.services.live.CacheBroker with a shared HOSTEL_CACHE when running several workers.
+HOSTEL_LIVE_BACKEND = os.environ.get('HOSTEL_LIVE_BACKEND', 'hostel.services.live.LocalBroker')
+# Seconds between keep-alive comments on an idle event stream
+HOSTEL_LIVE_HEARTBEAT = 15
+# Seconds one event stream stays open before the browser is made to reconnect
+HOSTEL_LIVE_MAX_AGE = 300
+
+# Per-request SQL/template timings, browsable at /admin/perf/. Set HOSTEL_PERF_LOG=INFO to also
+# emit every sample as a JSON line on the "hostel.perf" logger.
+HOSTEL_PERF_ENABLED = True
+HOSTEL_PERF_BUFFER_SIZE = 1000
+HOSTEL_PERF_DUPLICATE_THRESHOLD = 5
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {
+        'hostel.perf': {
+            'handlers': ['console'],
+            'level': os.environ.get('HOSTEL_PERF_LOG', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -4,7 +4,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import HttpResponse
-from hostel import admin, views
+from hostel import admin, api, views
 from hostel.views import RegisterSelect2View, RoomSelect2View 
 from hostel.admin import admin_site  # ✅ if admin_site is declared in hostel/admin.py
 
@@ -44,8 +44,20 @@ urlpatterns = [
     path("select2/room/", RoomSelect2View.as_view(), name="select2_room"),
     path('custom/new-payment/', new_payment_view, name='new_payment_view_fix'),
     path('custom/balance-payment/', balance_payment_view, name='balance_payment_view'),
+    path('custom/export/payments/', views.export_payments_view, name='export_payments_view'),
     path('ajax/get-members-by-room/', views.get_members_by_room, name='get_members_by_room'),
     path('ajax/get-balance-by-member/', views.get_balance_by_member, name='get_balance_by_member'),
+    path('ajax/balances/', views.balances_view, name='balances_view'),
+
+    # Async read-only dashboard API; serve with an ASGI server to keep it off the sync workers
+    path('api/occupancy/', api.occupancy_summary, name='api_occupancy'),
+    path('api/floors/', api.floor_availability, name='api_floors'),
+    path('api/members/', api.member_list, name='api_members'),
+    path('api/payments/', api.payment_list, name='api_payments'),
+    path('api/members/<int:member_id>/balance/', api.member_balance, name='api_member_balance'),
+    path('api/collections/today/', api.collections_today, name='api_collections_today'),
+    path('api/snapshots/compare/', api.snapshot_comparison, name='api_snapshot_comparison'),
+    path('api/live/', api.live_events, name='api_live'),
 
     # ✅ Custom admin site must be last
     path('admin/', admin_site.urls),
@@ -1,3 +1,7 @@
+import io
+from datetime import date, timedelta
+
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, reverse, reverse_lazy
 from django.utils.html import format_html
@@ -7,19 +11,26 @@ from django.contrib import messages
 from django.contrib.admin import AdminSite
 from django.contrib.auth.models import Group, User
 from django.contrib.admin.sites import NotRegistered
-from django.db.models import Sum
-from django.utils.timezone import now
 from .models import RoomAvailabilityProxy
-from hostel.views import room_availability_view
+from hostel import views
 from django.contrib.admin.models import LogEntry
+from django.core.paginator import Paginator
 
 from .models import (
     Room, Register, ChangeRoomProxy, SwapRoomProxy,
-    Payment, NewPaymentProxy, BalancePaymentProxy, VacateMemberProxy
+    Payment, NewPaymentProxy, BalancePaymentProxy, VacateMemberProxy, ArchivedPayment
 )
 from .forms import (
-    FloorRoomForm, ChangeRoomForm, RoomSwapForm, VacateMemberForm, RegisterForm
+    VacateMemberForm, RegisterForm, PaymentImportForm
 )
+from .services.availability import availability_context
+from .services.dashboard import ACTIVITY_LIMIT, ACTIVITY_PAGE_SIZE, dashboard_stats
+from .services.exports import member_rows, payment_rows, stream_csv
+from .services.imports import import_payments, read_payment_rows
+from .services.live import streams_live
+from .services.snapshots import compare, snapshot_dates
+from .services.transfers import RoomTransferService
+from .services import perf
 
 # Unregister default auth models
 for model in [Group, User]:
@@ -28,17 +39,6 @@ for model in [Group, User]:
     except NotRegistered:
         pass
 
-# Calculate balance for a member
-def calculate_member_balance(member):
-    total_days = (now().date() - member.joined_date).days
-    cycles = total_days // 30
-    if total_days % 30 != 0:
-        cycles += 1
-    total_due = member.total_rent * cycles
-    total_paid = Payment.objects.filter(member=member).aggregate(total=Sum('amount'))['total'] or 0
-    return total_due - total_paid
-
-
 class RoomAdmin(admin.ModelAdmin):
     change_list_template = "admin/hostel/room_filter.html"
     list_display = ('room_number', 'floor', 'capacity', 'rent', 'has_attached_washroom', 'admin_actions')
@@ -58,77 +58,20 @@ class RoomAdmin(admin.ModelAdmin):
     def changelist_view(self, request, extra_context=None):
         return self.room_filter_view(request)
 
+    # Thin adapters over the shared views in hostel.views, mounted under the admin's URLs
     def room_filter_view(self, request):
-        form = FloorRoomForm(request.GET or None)
-        selected_room = None
-        members = []
-
-        if form.is_valid() and form.cleaned_data.get('room'):
-            selected_room = Room.objects.get(id=form.cleaned_data['room'])
-            members = Register.objects.filter(room=selected_room)
-
-        return render(request, "admin/hostel/room_filter.html", {
-            'form': form,
-            'room_obj': selected_room,
-            'members': members,
-        })
+        return views.room_filter_view(request)
 
     def change_room_view(self, request):
-        message = ''
-        if request.method == 'POST':
-            form = ChangeRoomForm(request.POST)
-            if form.is_valid():
-                member = form.cleaned_data['member']
-                new_room = form.cleaned_data['new_room']
-                member.room = new_room
-                member.save()
-                message = f"{member.full_name()} has been moved to Room {new_room.room_number}"
-        else:
-            form = ChangeRoomForm()
-
-        return render(request, 'admin/hostel/change_room.html', {
-            'form': form,
-            'message': message
-        })
+        return views.change_room_view(request)
 
     def room_swap_view(self, request):
-        message = ''
-        if request.method == 'POST':
-            form = RoomSwapForm(request.POST)
-            if form.is_valid():
-                m1 = form.cleaned_data['member1']
-                m2 = form.cleaned_data['member2']
-                m1.room, m2.room = m2.room, m1.room
-                m1.save()
-                m2.save()
-                message = f"{m1.full_name()} and {m2.full_name()} have successfully swapped rooms."
-        else:
-            form = RoomSwapForm()
-
-        return render(request, 'admin/hostel/room_swap.html', {
-            'form': form,
-            'message': message
-        })
+        return views.room_swap_view(request)
 
     def room_availability_view(self, request):
-        rooms = Room.objects.all().order_by('floor', 'room_number')
-        room_data = []
-
-        for room in rooms:
-            occupied = Register.objects.filter(room=room, is_active=True).count()
-            vacancy = room.capacity - occupied
-            room_data.append({
-                'floor': room.floor,
-                'room_number': room.room_number,
-                'capacity': room.capacity,
-                'occupied': occupied,
-                'vacancy': vacancy,
-                'has_washroom': "Yes" if room.has_attached_washroom else "No"
-            })
-
+        context = availability_context(request.GET, show_all=True)
         return render(request, 'admin/hostel/room_availability.html', {
-            'room_data': room_data,
-            'title': 'Room Availability Overview'
+            **context, 'title': 'Room Availability Overview', 'live_updates': streams_live(request),
         })
 
     def admin_actions(self, obj):
@@ -156,7 +99,12 @@ class RegisterAdmin(admin.ModelAdmin):
     search_fields = ['first_name', 'sur_name', 'guardian_name', 'aadhar_number', 'contact_number', 'job_or_study']
     readonly_fields = ['joined_date', 'paid_amount']
     list_select_related = ('room',)
-    actions = ['change_room_action']
+    actions = ['change_room_action', 'export_csv_action']
+
+    def export_csv_action(self, request, queryset):
+        return stream_csv("members.csv", member_rows(queryset))
+
+    export_csv_action.short_description = "Export selected members with balances (CSV)"
 
     def change_room_action(self, request, queryset):
         if 'apply' in request.POST:
@@ -167,14 +115,14 @@ class RegisterAdmin(admin.ModelAdmin):
                 self.message_user(request, "Invalid room selected.", level=messages.ERROR)
                 return
 
-            updated = 0
-            for member in queryset:
-                if new_room.available_slots > 0:
-                    member.room = new_room
-                    member.save()
-                    updated += 1
-
-            self.message_user(request, f"{updated} members moved to {new_room.room_number}")
+            moved, skipped = RoomTransferService(request.user).bulk_move(queryset, new_room)
+            if moved:
+                names = ", ".join(member.full_name() for member in moved)
+                self.message_user(request, f"{len(moved)} members moved to {new_room.room_number}: {names}")
+            else:
+                self.message_user(request, f"No members moved to {new_room.room_number}", level=messages.WARNING)
+            for member, reason in skipped:
+                self.message_user(request, f"Skipped {member.full_name()}: {reason}", level=messages.WARNING)
             return redirect(request.get_full_path())
 
         rooms = Room.objects.all()
@@ -209,19 +157,26 @@ class VacateMemberAdmin(admin.ModelAdmin):
 @admin.register(NewPaymentProxy)
 class NewPaymentAdmin(admin.ModelAdmin):
     list_display = ['member', 'get_room', 'amount', 'payment_date', 'get_balance_display', 'notes']
+    list_select_related = ('member__room',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_member_balance()
 
     def get_room(self, obj):
         return obj.member.room
     get_room.short_description = 'Room'
+    get_room.admin_order_field = 'member__room__room_number'
 
     def get_balance_display(self, obj):
-        balance = calculate_member_balance(obj.member)
+        balance = obj.member_balance
         if balance > 0:
             return mark_safe(f"<span style='color:red;'>Due ₹{balance:.2f}</span>")
         elif balance < 0:
             return mark_safe(f"<span style='color:green;'>Advance ₹{abs(balance):.2f}</span>")
         else:
             return mark_safe("<span style='color:gray;'>Fully Paid</span>")
+    get_balance_display.short_description = 'Balance'
+    get_balance_display.admin_order_field = 'member_balance'
 
 
 @admin.register(BalancePaymentProxy)
@@ -231,9 +186,51 @@ class BalancePaymentAdmin(admin.ModelAdmin):
 
 
 class PaymentAdmin(admin.ModelAdmin):
+    change_list_template = "admin/hostel/payment_change_list.html"
     list_display = ('member', 'member_room', 'formatted_amount', 'payment_date', 'balance_remaining', 'notes')
-    list_filter = ['member__room__room_number', 'member__room__floor']
+    list_filter = ['member__room__room_number', 'member__room__floor', 'payment_date', 'member__payment_status']
     search_fields = ['member__first_name', 'member__sur_name', 'notes']
+    list_select_related = ('member__room',)
+    actions = ['export_csv_action']
+
+    def export_csv_action(self, request, queryset):
+        return stream_csv("payments.csv", payment_rows(queryset))
+
+    export_csv_action.short_description = "Export selected payments (CSV)"
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path('import/', self.admin_site.admin_view(self.import_payments_view), name='import_payments_view'),
+        ]
+        return custom_urls + urls
+
+    def import_payments_view(self, request):
+        errors = []
+        form = PaymentImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            lines = io.TextIOWrapper(form.cleaned_data['csv_file'].file, encoding='utf-8-sig', newline='')
+            try:
+                result = import_payments(read_payment_rows(lines), dry_run=form.cleaned_data['dry_run'])
+            except UnicodeDecodeError:
+                form.add_error('csv_file', "The file is not UTF-8 text. Save it as \"CSV UTF-8\" and upload it again.")
+            else:
+                errors = result['errors']
+                skipped = f" Skipped {result['skipped']} already recorded." if result['skipped'] else ""
+                if not errors and form.cleaned_data['dry_run']:
+                    messages.info(request, f"File is valid: ₹{result['total']} for {result['members']} members.{skipped} Nothing was saved.")
+                elif not errors:
+                    self.message_user(request, f"Imported {result['created']} payments totalling ₹{result['total']}.{skipped}")
+                    return redirect('admin:hostel_payment_changelist')
+
+        return render(request, 'admin/hostel/import_payments.html', {
+            'form': form,
+            'errors': errors,
+            'title': 'Import Payments',
+        })
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_member_balance()
 
     def formatted_amount(self, obj):
         return mark_safe(f"₹{float(obj.amount):,.0f}")
@@ -242,10 +239,11 @@ class PaymentAdmin(admin.ModelAdmin):
     def member_room(self, obj):
         return obj.member.room.room_number if obj.member and obj.member.room else "—"
     member_room.short_description = "Room"
+    member_room.admin_order_field = 'member__room__room_number'
 
     def balance_remaining(self, obj):
         if obj.member:
-            balance = calculate_member_balance(obj.member)
+            balance = obj.member_balance
             if balance < 0:
                 return mark_safe(f"<span style='color:green;'>Advance ₹{abs(balance):.2f}</span>")
             elif balance == 0:
@@ -253,6 +251,30 @@ class PaymentAdmin(admin.ModelAdmin):
             else:
                 return mark_safe(f"<span style='color:red;'>Due ₹{balance:.2f}</span>")
         return "-"
+    balance_remaining.admin_order_field = 'member_balance'
+
+
+class ArchivedPaymentAdmin(admin.ModelAdmin):
+    """Read-only view of the payments moved out by `manage.py archive_payments`"""
+    list_display = ('id', 'member', 'amount', 'payment_date', 'notes', 'archived_at')
+    list_filter = ['payment_date']
+    search_fields = ['member__first_name', 'member__sur_name', 'notes']
+    list_select_related = ('member',)
+    actions = ['export_csv_action']
+
+    def export_csv_action(self, request, queryset):
+        return stream_csv("archived-payments.csv", payment_rows(queryset))
+
+    export_csv_action.short_description = "Export selected payments (CSV)"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 class RoomAvailabilityAdmin(admin.ModelAdmin):
@@ -270,26 +292,59 @@ class CustomAdminSite(AdminSite):
     index_title = "Welcome to Venu Hostel Admin"
 
     def index(self, request, extra_context=None):
-        total_rooms = Room.objects.count()
-        total_members = Register.objects.count()
-        active_members = Register.objects.filter(is_active=True).count()
-        vacant_rooms = total_rooms - active_members
-
-        log_entries = LogEntry.objects.select_related('content_type', 'user').order_by('-action_time')
+        log_entries = (
+            LogEntry.objects.select_related('content_type', 'user')
+            .order_by('-action_time')[:ACTIVITY_LIMIT]
+        )
+        activity_page = Paginator(log_entries, ACTIVITY_PAGE_SIZE).get_page(request.GET.get('activity_page'))
 
         context = {
         'title': self.index_title,
         'site_title': self.site_title,
         'site_header': self.site_header,
-        'total_rooms': total_rooms,
-        'total_members': total_members,
-        'active_members': active_members,
-        'vacant_rooms': vacant_rooms,
+        **dashboard_stats(),
         'app_list': self.get_app_list(request),
-        'log_entries': log_entries,  # must be a queryset
+        'log_entries': activity_page,
         }
         return render(request, 'admin/hostel/index.html', context)
 
+    def get_urls(self):
+        custom_urls = [
+            path('perf/', self.admin_view(self.perf_view), name='perf'),
+            path('snapshots/', self.admin_view(self.snapshot_report_view), name='snapshot_report'),
+        ]
+        return custom_urls + super().get_urls()
+
+    def perf_view(self, request):
+        return render(request, 'admin/hostel/perf.html', {
+            **self.each_context(request),
+            'title': 'Request Performance',
+            'rows': perf.summarize(),
+            'sample_count': len(perf.samples),
+            'duplicate_threshold': getattr(settings, 'HOSTEL_PERF_DUPLICATE_THRESHOLD', 5),
+        })
+
+    def snapshot_report_view(self, request):
+        """Compare two snapshot days; defaults to the latest snapshot against the one a month before"""
+        dates = snapshot_dates()
+        day_b = _parse_day(request.GET.get('to')) or (dates[0] if dates else None)
+        day_a = _parse_day(request.GET.get('from')) or (day_b - timedelta(days=30) if day_b else None)
+        return render(request, 'admin/hostel/snapshot_report.html', {
+            **self.each_context(request),
+            'title': 'Balance & Occupancy History',
+            'dates': dates,
+            'day_a': day_a,
+            'day_b': day_b,
+            'report': compare(day_a, day_b) if dates else None,
+        })
+
+
+def _parse_day(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
 
 
 # Register models with custom admin site
@@ -302,4 +357,5 @@ admin_site.register(NewPaymentProxy, NewPaymentAdmin)
 admin_site.register(BalancePaymentProxy, BalancePaymentAdmin)
 admin_site.register(VacateMemberProxy, VacateMemberAdmin)
 admin_site.register(Payment, PaymentAdmin)
+admin_site.register(ArchivedPayment, ArchivedPaymentAdmin)
 admin_site.register(RoomAvailabilityProxy, RoomAvailabilityAdmin)
@@ -0,0 +1,228 @@
+"""Read-only JSON API for the occupancy and dues dashboards.
+
+The views are async and use the async ORM, so under ASGI (``uvicorn Shanmukha_project.asgi:application``)
+a screen polling them waits on the event loop instead of holding a sync worker thread.
+"""
+import json
+import time
+from contextlib import aclosing
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.timezone import now
+from django.views.decorators.http import require_GET
+
+from .models import ArchivedPayment, Payment, Register, Room
+from .services.availability import aavailability_matrix, parse_availability_filters
+from .services.balances import amember_balance
+from .services.dashboard import room_totals
+from .services.exports import filter_members, filter_payments, parse_export_filters
+from .services.live import broker, streams_live
+from .services.pagination import akeyset_page, akeyset_union_page
+from .services.snapshots import compare
+
+# Most of today's payments listed by collections_today
+RECENT_PAYMENTS = 50
+
+# Rows per page of the listing endpoints, and the most ?limit= may ask for
+LIST_PAGE_SIZE = 100
+LIST_PAGE_MAX = 500
+
+# Seek keys of the listings: members by room then id, payments newest first
+MEMBER_KEYS = ('room__room_number', 'id')
+PAYMENT_KEYS = ('payment_date', 'id')
+
+
+def _json(payload, status=200):
+    return JsonResponse(payload, status=status, json_dumps_params={'separators': (',', ':')})
+
+
+def _page_size(params):
+    try:
+        return min(max(int(params.get('limit')), 1), LIST_PAGE_MAX)
+    except (TypeError, ValueError):
+        return LIST_PAGE_SIZE
+
+
+def _listing(request, rows, next_cursor):
+    """Page payload with the URL of the next page, which keeps the request's other filters"""
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        next_url = f"{request.path}?{params.urlencode()}"
+    return _json({'results': rows, 'next': next_url})
+
+
+@staff_member_required
+@require_GET
+async def occupancy_summary(request):
+    """Room and bed counts plus the number of active members"""
+    rooms = await Room.objects.aaggregate(**room_totals())
+    return _json({
+        **rooms,
+        'free_beds': rooms['total_beds'] - rooms['occupied_beds'],
+        'active_members': await Register.objects.filter(is_active=True).acount(),
+    })
+
+
+@staff_member_required
+@require_GET
+async def floor_availability(request):
+    """Per-floor capacity/occupied/vacancy with their rooms; takes the availability page's filters"""
+    floors = await aavailability_matrix(**parse_availability_filters(request.GET))
+    for floor in floors:
+        for room in floor['rooms']:
+            del room['has_washroom']
+    return _json({'floors': floors})
+
+
+@staff_member_required
+@require_GET
+async def member_balance(request, member_id):
+    balance = await amember_balance(member_id)
+    if balance is None:
+        return _json({'error': 'Member not found'}, status=404)
+    return _json({'member_id': member_id, 'balance': balance})
+
+
+@staff_member_required
+@require_GET
+async def member_list(request):
+    """Members who have a room, by room number; ?floor=, ?status=Paid|Unpaid, ?active=0 for the inactive"""
+    members = filter_members(**parse_export_filters(request.GET)).filter(
+        room__isnull=False, is_active=request.GET.get('active') != '0',
+    )
+    rows, next_cursor = await akeyset_page(
+        members.with_balances().values(
+            'id', 'sur_name', 'first_name', 'room__room_number', 'is_active', 'total_rent', 'balance',
+        ),
+        MEMBER_KEYS, request.GET.get('cursor'), _page_size(request.GET),
+    )
+    return _listing(request, [
+        {
+            'id': row['id'],
+            'name': f"{row['sur_name']} {row['first_name']}",
+            'room': row['room__room_number'],
+            'active': row['is_active'],
+            'monthly_rent': row['total_rent'],
+            'balance': row['balance'],
+        }
+        for row in rows
+    ], next_cursor)
+
+
+@staff_member_required
+@require_GET
+async def payment_list(request):
+    """Payment history, newest first, archived payments included; ?member=, ?date_from=, ?date_to=, ?floor=, ?status="""
+    filters = parse_export_filters(request.GET)
+    member = request.GET.get('member')
+    if member and not member.isdigit():
+        return _json({'error': 'member must be an integer'}, status=400)
+    fields = ('id', 'payment_date', 'member_id', 'member__room__room_number', 'amount', 'notes')
+    querysets = []
+    for model in (Payment, ArchivedPayment):
+        payments = filter_payments(model.objects.all(), **filters)
+        if member:
+            payments = payments.filter(member_id=member)
+        querysets.append(payments.values(*fields))
+    rows, next_cursor = await akeyset_union_page(
+        querysets, PAYMENT_KEYS, request.GET.get('cursor'), _page_size(request.GET), descending=True,
+    )
+    return _listing(request, [
+        {
+            'id': row['id'],
+            'date': row['payment_date'],
+            'member_id': row['member_id'],
+            'room': row['member__room__room_number'],
+            'amount': row['amount'],
+            'notes': row['notes'],
+        }
+        for row in rows
+    ], next_cursor)
+
+
+@staff_member_required
+@require_GET
+async def collections_today(request):
+    """Total and count of today's payments and the latest of them, archived ones included"""
+    today = now().date()
+    totals = {'total': 0, 'count': 0}
+    recent = []
+    for model in (Payment, ArchivedPayment):
+        payments = model.objects.filter(payment_date=today)
+        for name, value in (await payments.aaggregate(total=Coalesce(Sum('amount'), 0), count=Count('id'))).items():
+            totals[name] += value
+        recent += [
+            payment async for payment in payments.order_by('-id').values(
+                'id', 'member_id', 'member__sur_name', 'member__first_name', 'member__room__room_number', 'amount',
+            )[:RECENT_PAYMENTS]
+        ]
+    recent = sorted(recent, key=lambda payment: payment['id'], reverse=True)[:RECENT_PAYMENTS]
+    return _json({'date': today, **totals, 'payments': [
+        {
+            'id': payment['id'],
+            'member_id': payment['member_id'],
+            'name': f"{payment['member__sur_name']} {payment['member__first_name']}",
+            'room': payment['member__room__room_number'],
+            'amount': payment['amount'],
+        }
+        for payment in recent
+    ]})
+
+
+@staff_member_required
+@require_GET
+async def snapshot_comparison(request):
+    """?from=YYYY-MM-DD&to=YYYY-MM-DD -> both days' snapshot figures, per floor and the biggest movers"""
+    try:
+        day_a, day_b = date.fromisoformat(request.GET['from']), date.fromisoformat(request.GET['to'])
+    except (KeyError, ValueError):
+        return _json({'error': 'from and to must be YYYY-MM-DD dates'}, status=400)
+    report = await sync_to_async(compare)(day_a, day_b)
+    if report is None:
+        return _json({'error': 'No snapshot on or before both days'}, status=404)
+    return _json(report)
+
+
+@staff_member_required
+@require_GET
+async def live_events(request):
+    """Server-sent events: a 'room' or 'member' event whenever one changes, a comment while idle.
+
+    ?types=room,member narrows the stream to those event types. The stream closes after
+    HOSTEL_LIVE_MAX_AGE seconds and EventSource reconnects. Under WSGI it would pin a worker,
+    so the answer is 204 there, which tells EventSource not to reconnect.
+    """
+    if not streams_live(request):
+        return HttpResponse(status=204)
+    types = set(filter(None, request.GET.get('types', '').split(','))) or {'room', 'member'}
+    heartbeat = getattr(settings, 'HOSTEL_LIVE_HEARTBEAT', 15)
+    max_age = getattr(settings, 'HOSTEL_LIVE_MAX_AGE', 300)
+
+    async def stream():
+        # Tell EventSource how soon to reconnect after a dropped or expired connection
+        yield 'retry: 3000\n\n'
+        deadline = time.monotonic() + max_age
+        async with aclosing(broker.subscribe(timeout=heartbeat)) as events:
+            async for event in events:
+                if event is None:
+                    yield ': keep-alive\n\n'
+                elif event['type'] in types:
+                    data = json.dumps(event, cls=DjangoJSONEncoder, separators=(',', ':'))
+                    yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {data}\n\n"
+                if time.monotonic() >= deadline:
+                    break
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep reverse proxies (nginx) from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
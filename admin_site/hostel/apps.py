@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, post_save, post_delete
 
 class HostelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
@@ -7,7 +7,27 @@ class HostelConfig(AppConfig):
 
     def ready(self):
         from hostel.scripts.populate_rooms import run  # <- fix here
+        from hostel import signals
+        from hostel.models import Payment, Register, Room, rooms_reassigned
         post_migrate.connect(run_after_migrate, sender=self)
+        rooms_reassigned.connect(signals.rooms_reassigned)
+
+        # Proxy models (NewPaymentProxy, VacateMemberProxy, ...) send signals under their own class
+        for model in self.get_models():
+            concrete = model._meta.concrete_model
+            if concrete is Payment:
+                post_delete.connect(signals.payment_deleted, sender=model)
+            if concrete is Register:
+                post_delete.connect(signals.member_deleted, sender=model)
+            if concrete in (Room, Register, Payment):
+                post_save.connect(signals.hostel_data_changed, sender=model)
+                post_delete.connect(signals.hostel_data_changed, sender=model)
+                post_save.connect(signals.dues_changed, sender=model)
+                post_delete.connect(signals.dues_changed, sender=model)
+                post_save.connect(signals.bump_versions, sender=model)
+                post_delete.connect(signals.bump_versions, sender=model)
+                post_save.connect(signals.publish_live, sender=model)
+                post_delete.connect(signals.publish_live, sender=model)
 
 def run_after_migrate(sender, **kwargs):
     from hostel.scripts.populate_rooms import run  # <- fix here
@@ -42,7 +42,7 @@ class RoomSwapForm(forms.Form):
 class MemberWidget(HeavySelect2Widget):
     data_view = 'select2_register'
     attrs = {
-        'data-placeholder': 'Type surname…',
+        'data-placeholder': 'Type name, phone or room…',
         'data-minimum-input-length': 1,
         'style': 'width: 350px;',
         'data-ajax--cache': 'true'
@@ -132,6 +132,15 @@ class RegisterForm(forms.ModelForm):
             choices=[('', '--------')] + [(room.id, str(room)) for room in Room.objects.all()]
         )
 
+    def clean(self):
+        cleaned_data = super().clean()
+        room = cleaned_data.get('room')
+        is_active = cleaned_data.get('is_active', True)
+        moving_in = self.instance._state.adding or not self.instance.is_active or self.instance.room_id != getattr(room, 'id', None)
+        if room and is_active and moving_in and room.available_slots <= 0:
+            self.add_error('room', f"Room {room.room_number} is full.")
+        return cleaned_data
+
 
 class VacateMemberForm(forms.Form):
     room = forms.ModelChoiceField(queryset=Room.objects.all(), label="Room Number")
@@ -164,3 +173,11 @@ class VacateMemberForm(forms.Form):
 
         if payment_status in ['waived', 'partial'] and not note:
             self.add_error('note', 'Note is required for waived or partially paid balances.')
+
+
+class PaymentImportForm(forms.Form):
+    csv_file = forms.FileField(
+        label="Payments CSV",
+        help_text="Columns: amount, date (optional), notes (optional) and one of member_id, aadhar, contact, room."
+    )
+    dry_run = forms.BooleanField(label="Validate only", required=False)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from hostel.services.archive import ARCHIVE_BATCH_SIZE, archivable_payments, archive_payments, archive_summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the payments of vacated members, and payments older than the horizon, from Payment to the "
+        "archive, folding them into per-member opening balances. Balances do not change; safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon-days', type=int,
+                            help="Archive payments older than this many days (default HOSTEL_ARCHIVE_HORIZON_DAYS)")
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be archived")
+
+    def handle(self, *args, **options):
+        payments = archivable_payments(options['horizon_days'])
+        if options['dry_run']:
+            summary = archive_summary(payments)
+            self.stdout.write(
+                f"Would archive {summary['payments']} payments (₹{summary['amount']}) of {summary['members']} members."
+            )
+            return
+
+        moved = archive_payments(payments, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved['payments']} payments (₹{moved['amount']}) of {moved['members']} members."
+        ))
@@ -0,0 +1,96 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from hostel.models import Payment, Register, Room
+from hostel.scripts.generate_data import generate
+from hostel.services.availability import rooms_with_occupancy
+
+
+def hot_queries():
+    """The filters behind the balance, availability, vacate and member-list screens"""
+    room = Room.objects.filter(occupied_count__gt=0).order_by('room_number').first() or Room.objects.first()
+    member = Register.objects.filter(is_active=True).order_by('pk').first()
+    return {
+        'balance report (floor 1)': Register.objects.filter(is_active=True, room__floor=1).with_balances(),
+        'balance as of 90 days ago': Register.objects.filter(is_active=True).with_balances(
+            as_of=now().date() - timedelta(days=90)
+        ),
+        'availability (floor 1)': rooms_with_occupancy(floor=1),
+        'vacate: members of a room': Register.objects.filter(room=room, is_active=True),
+        'member picker ordering': Register.objects.filter(is_active=True).order_by('sur_name', 'first_name')[:20],
+        'payment history of a member': Payment.objects.filter(member=member).order_by('-payment_date'),
+        "today's collections": Payment.objects.filter(payment_date=now().date()),
+        'unpaid members by join date': Register.objects.filter(payment_status='Unpaid').order_by('-joined_date'),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic members and payments inside a rolled-back transaction and record the "
+        "query plan and timing of the hot filters with and without the hostel indexes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=2000)
+        parser.add_argument('--months', type=int, default=24, help="Months of payment history per member")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed executions per query")
+        parser.add_argument('--output', help="Write the results as JSON to this path")
+
+    def handle(self, *args, **options):
+        results = {}
+        with transaction.atomic():
+            self.seed(options['members'], options['months'])
+            editor = connection.schema_editor()
+            indexes = [(model, index) for model in (Room, Register, Payment) for index in model._meta.indexes]
+
+            self.run_statements(
+                editor.sql_delete_index % {
+                    'name': editor.quote_name(index.name),
+                    'table': editor.quote_name(model._meta.db_table),
+                }
+                for model, index in indexes
+            )
+            results['without_indexes'] = self.measure(options['repeat'])
+
+            self.run_statements(index.create_sql(model, editor) for model, index in indexes)
+            results['with_indexes'] = self.measure(options['repeat'])
+
+            # Leave the database exactly as it was
+            transaction.set_rollback(True)
+
+        for name in results['with_indexes']:
+            before, after = results['without_indexes'][name], results['with_indexes'][name]
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(f"  before: {before['ms']:.2f} ms  {' | '.join(before['plan'])}")
+            self.stdout.write(f"  after:  {after['ms']:.2f} ms  {' | '.join(after['plan'])}")
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def seed(self, member_count, months):
+        seeded = generate(members=member_count, years=months / 12)
+        self.stdout.write(f"Seeded {seeded['members']} members and {seeded['payments']} payments.")
+
+    def run_statements(self, statements):
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(str(statement))
+
+    def measure(self, repeat):
+        measured = {}
+        for name, queryset in hot_queries().items():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                list(queryset.all())
+            measured[name] = {
+                'ms': (time.perf_counter() - started) * 1000 / repeat,
+                'plan': queryset.explain().splitlines(),
+            }
+        return measured
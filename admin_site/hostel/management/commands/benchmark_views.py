@@ -0,0 +1,118 @@
+import json
+import statistics
+import subprocess
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.utils.timezone import now
+
+from hostel.models import Register, Room
+from hostel.scripts.generate_data import generate
+
+
+def key_views():
+    """(name, url) of the screens the benchmark times; ids come from the seeded data"""
+    room = Room.objects.filter(occupied_count__gt=0).order_by('room_number').first()
+    member = Register.objects.filter(is_active=True).order_by('pk').first()
+    return [
+        ('balance_payment_view', '/custom/balance-payment/'),
+        ('balance_payment_view (floor 1)', '/custom/balance-payment/?floor=1'),
+        ('room_availability_view', '/admin/hostel/room-availability/?view=1'),
+        ('vacate_member_view', f'/custom/vacate-member/?room={room.pk}&member={member.pk}'),
+        ('select2 members', f'/select2/register/?term={member.sur_name[:3]}'),
+        ('select2 rooms', '/select2/room/?term=1'),
+        ('admin index', '/admin/'),
+        ('payment changelist', '/admin/hostel/payment/'),
+        ('member balance (ajax)', f'/ajax/get-balance-by-member/?member_id={member.pk}'),
+    ]
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with synthetic residents and record the wall time and "
+        "query count of the key views through the test client, one run per resident count"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--residents', default='100,1000,10000', help="Comma-separated resident counts")
+        parser.add_argument('--years', type=float, default=1, help="Years of payment history")
+        parser.add_argument('--repeat', type=int, default=10, help="Timed requests per view")
+        parser.add_argument('--output', help="Write the results as JSON to this path")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['residents'].split(',')]
+        except ValueError:
+            raise CommandError("--residents must be comma-separated integers, e.g. 100,1000")
+
+        report = {'commit': current_commit(), 'run_at': now().isoformat(), 'results': {}}
+        setup_test_environment()
+        try:
+            for size in sizes:
+                report['results'][str(size)] = self.run_size(size, options)
+        finally:
+            teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def run_size(self, size, options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            started = time.perf_counter()
+            seeded = generate(members=size, years=options['years'])
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{size} residents: {seeded['rooms']} rooms, {seeded['active']} active, "
+                f"{seeded['payments']} payments (seeded in {time.perf_counter() - started:.1f}s)"
+            ))
+            cache.clear()
+            client = Client()
+            client.force_login(User.objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark'))
+
+            results = {'seeded': seeded, 'views': {}}
+            for name, url in key_views():
+                results['views'][name] = measured = self.measure(client, url, options['repeat'])
+                self.stdout.write(
+                    f"  {name:<32} {measured['median_ms']:>9.2f} ms median  {measured['p95_ms']:>9.2f} ms p95  "
+                    f"{measured['queries']:>4} queries"
+                )
+            return results
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def measure(self, client, url, repeat):
+        # The first request warms caches (dashboard stats, dues summary) like a real session would
+        client.get(url)
+        timings, queries = [], []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"{url} returned {response.status_code}")
+            queries.append(len(ctx))
+        return {
+            'url': url,
+            'median_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(statistics.quantiles(timings, n=20, method='inclusive')[-1] if repeat > 1 else timings[0], 2),
+            'min_ms': round(min(timings), 2),
+            'queries': max(queries),
+        }
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import now
+
+from hostel.models import Register
+
+
+class Command(BaseCommand):
+    help = (
+        "Bill every active member for the 30-day rent cycles started up to a date. "
+        "Safe to re-run; missed days are caught up in one pass."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--as-of', help="Bill cycles started on or before this date (YYYY-MM-DD, default today)")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        as_of = now().date()
+        if options['as_of']:
+            try:
+                as_of = datetime.strptime(options['as_of'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError(f"Invalid --as-of date '{options['as_of']}', expected YYYY-MM-DD")
+
+        members, charges, amount = Register.objects.generate_charges(as_of, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Billed {charges} cycles (₹{amount}) to {members} members up to {as_of}."
+        ))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from hostel.services.imports import MEMBER_KEYS, import_payments, read_payment_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import payments from a CSV with an amount column, optional date/notes columns and one of "
+        f"{', '.join(MEMBER_KEYS)} to identify the member. The whole file is validated before anything is saved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; save nothing")
+        parser.add_argument('--encoding', default='utf-8-sig')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_path'], newline='', encoding=options['encoding']) as fh:
+                result = import_payments(read_payment_rows(fh), dry_run=options['dry_run'])
+        except OSError as e:
+            raise CommandError(f"Cannot read {options['csv_path']}: {e}")
+        except UnicodeDecodeError as e:
+            raise CommandError(f"{options['csv_path']} is not {options['encoding']} text ({e}); pass --encoding")
+
+        for error in result['errors']:
+            self.stderr.write(error)
+        if result['errors']:
+            raise CommandError(f"{len(result['errors'])} invalid row(s); nothing was imported.")
+
+        if result['skipped']:
+            self.stdout.write(f"Skipped {result['skipped']} row(s) already recorded.")
+        if options['dry_run']:
+            self.stdout.write(
+                f"Dry run OK: would import payments totalling ₹{result['total']} for {result['members']} members."
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Imported {result['created']} payments totalling ₹{result['total']} for {result['members']} members."
+            ))
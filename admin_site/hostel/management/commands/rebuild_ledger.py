@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from hostel.models import LEDGER_FIELDS, Register
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized payment ledger on every member, archived payments included, "
+        "and report drift"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def ledgers(self, batch_size):
+        members = Register.objects.order_by('pk').values_list('pk', 'sur_name', 'first_name', *LEDGER_FIELDS)
+        return {pk: row for pk, *row in members.iterator(chunk_size=batch_size)}
+
+    def handle(self, *args, **options):
+        # The expected values are whatever refresh_ledger() writes, so the two can never disagree;
+        # a dry run recomputes them the same way and rolls back
+        with transaction.atomic():
+            stored = self.ledgers(options['batch_size'])
+            Register.objects.refresh_ledger()
+            drifted = 0
+            for pk, (sur_name, first_name, *expected) in self.ledgers(options['batch_size']).items():
+                paid, last, snapshot = stored[pk][2:]
+                if (paid, last, snapshot) == tuple(expected):
+                    continue
+                drifted += 1
+                self.stdout.write(
+                    f"{sur_name} {first_name} (#{pk}): paid {paid} -> {expected[0]}, "
+                    f"last payment {last} -> {expected[1]}, "
+                    f"snapshot {snapshot} -> {expected[2]}"
+                )
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        action = "found" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {len(stored)} members, {action} drift on {drifted}."
+        ))
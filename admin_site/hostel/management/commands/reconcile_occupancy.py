@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from hostel.models import Room
+
+
+class Command(BaseCommand):
+    help = "Recount active members per room and repair drifted occupied_count values"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rooms = Room.objects.annotate(
+                active=Count('register', filter=Q(register__is_active=True))
+            ).order_by('room_number')
+
+            drifted = []
+            for room in rooms:
+                if room.active == room.occupied_count:
+                    continue
+                over = " (over capacity)" if room.active > room.capacity else ""
+                self.stdout.write(f"Room {room.room_number}: {room.occupied_count} -> {room.active}{over}")
+                room.occupied_count = room.active
+                drifted.append(room)
+
+            if drifted and not options['dry_run']:
+                Room.objects.bulk_update(drifted, ['occupied_count'], batch_size=500)
+
+        action = "found" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"Checked {len(rooms)} rooms, {action} drift on {len(drifted)}."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from hostel.services.dues import refresh_dues
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-room and per-floor dues summary tables from the member ledgers"
+
+    def handle(self, *args, **options):
+        rooms, floors = refresh_dues()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed dues of {rooms} rooms on {floors} floors."))
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hostel.services.snapshots import SNAPSHOT_BATCH_SIZE, take_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Append today's per-member balances and per-room occupancy to the snapshot tables. "
+        "Run nightly (e.g. cron '55 23 * * *'); --date back-fills the balances of a past day. "
+        "A day already snapshotted is left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Day to snapshot (YYYY-MM-DD, default today)")
+        parser.add_argument('--batch-size', type=int, default=SNAPSHOT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        taken_on = None
+        if options['date']:
+            try:
+                taken_on = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError(f"Invalid --date '{options['date']}', expected YYYY-MM-DD")
+
+        try:
+            members, rooms = take_snapshot(taken_on, batch_size=options['batch_size'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot of {taken_on or 'today'}: {members} member balances, {rooms} rooms written."
+        ))
@@ -0,0 +1,51 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from hostel.services import perf
+
+
+class PerfMiddleware:
+    """Record SQL count/time, template time and total time of every request into hostel.services.perf.
+
+    Put it first in MIDDLEWARE so the timings cover the rest of the stack.
+    Disabled with HOSTEL_PERF_ENABLED = False. Works under WSGI and ASGI alike.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'HOSTEL_PERF_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        perf.instrument_templates()
+        perf.instrument_connections()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token = perf.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            perf.end_request(token)
+        return self._record(request, stats, response)
+
+    async def __acall__(self, request):
+        # The async ORM's queries run in a sync thread that inherits this context, so the
+        # connection wrapper charges them to this request's stats
+        stats, token = perf.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            perf.end_request(token)
+        return self._record(request, stats, response)
+
+    def _record(self, request, stats, response):
+        match = request.resolver_match
+        view = (match.view_name or match._func_path) if match else 'unresolved'
+        stats.finish(view, request.method, request.path, response.status_code)
+        return response
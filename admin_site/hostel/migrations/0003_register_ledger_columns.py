@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:36
+
+from django.db import migrations, models
+from django.db.models import Max, Sum
+
+
+def backfill_ledger(apps, schema_editor):
+    Register = apps.get_model('hostel', 'Register')
+    Payment = apps.get_model('hostel', 'Payment')
+
+    totals = {
+        row['member']: row
+        for row in Payment.objects.values('member').annotate(paid=Sum('amount'), last=Max('payment_date'))
+    }
+    members = list(Register.objects.filter(pk__in=totals))
+    for member in members:
+        row = totals[member.pk]
+        member.paid_amount = row['paid'] or 0
+        member.last_payment_date = row['last']
+        days_stayed = (row['last'] - member.joined_date).days
+        cycles = (days_stayed // 30) + 1 if days_stayed >= 0 else 0
+        member.balance_snapshot = member.total_rent * cycles - member.paid_amount
+    Register.objects.bulk_update(members, ['paid_amount', 'last_payment_date', 'balance_snapshot'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0002_vacatememberproxy_register_job_or_study'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='register',
+            name='balance_snapshot',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='register',
+            name='last_payment_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:02
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_occupancy(apps, schema_editor):
+    Room = apps.get_model('hostel', 'Room')
+    rooms = list(Room.objects.annotate(active=Count('register', filter=Q(register__is_active=True))))
+    for room in rooms:
+        room.occupied_count = room.active
+    Room.objects.bulk_update(rooms, ['occupied_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0003_register_ledger_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='occupied_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Tokenizer as of this migration, frozen here so later changes to MemberSearchToken don't alter it
+SOURCE_FIELDS = ('first_name', 'sur_name', 'contact_number', 'aadhar_number')
+WEIGHTS = {'sur_name': 4, 'first_name': 3, 'contact_number': 1, 'aadhar_number': 1}
+
+
+def tokens_for(member):
+    tokens = {}
+    for field in SOURCE_FIELDS:
+        value = getattr(member, field) or ""
+        if field in ('contact_number', 'aadhar_number'):
+            words = ["".join(ch for ch in value if ch.isdigit())]
+        else:
+            words = value.lower().split()
+        for word in words:
+            if word:
+                word = word[:50]
+                tokens[word] = max(tokens.get(word, 0), WEIGHTS[field])
+    return tokens
+
+
+def index_members(apps, schema_editor):
+    Register = apps.get_model('hostel', 'Register')
+    MemberSearchToken = apps.get_model('hostel', 'MemberSearchToken')
+
+    tokens = []
+    for member in Register.objects.only('id', *SOURCE_FIELDS).iterator(chunk_size=500):
+        tokens.extend(
+            MemberSearchToken(member_id=member.pk, token=token, weight=weight)
+            for token, weight in tokens_for(member).items()
+        )
+    MemberSearchToken.objects.bulk_create(tokens, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0004_room_occupied_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=50)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='hostel.register')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'member'], name='hostel_search_token_idx')],
+            },
+        ),
+        migrations.RunPython(index_members, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0005_member_search_tokens'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['member', 'payment_date'], name='hostel_pay_member_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_date'], name='hostel_pay_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='register',
+            index=models.Index(fields=['room', 'is_active'], name='hostel_reg_room_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='register',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['sur_name', 'first_name'], name='hostel_reg_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='register',
+            index=models.Index(fields=['payment_status'], name='hostel_reg_pay_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='register',
+            index=models.Index(fields=['joined_date'], name='hostel_reg_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['floor', 'room_number'], name='hostel_room_floor_number_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:10
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.timezone import now
+
+
+def bill_existing_members(apps, schema_editor):
+    """Charge every member, vacated ones included, up to today so current balances are unchanged"""
+    Register = apps.get_model('hostel', 'Register')
+    RentCharge = apps.get_model('hostel', 'RentCharge')
+    today = now().date()
+
+    charges, members = [], []
+    for member in Register.objects.only('id', 'joined_date', 'total_rent').iterator(chunk_size=500):
+        days_stayed = (today - member.joined_date).days
+        cycles = (days_stayed // 30) + 1 if days_stayed >= 0 else 0
+        charges.extend(
+            RentCharge(
+                member_id=member.pk,
+                cycle_number=cycle,
+                cycle_start=member.joined_date + timedelta(days=30 * (cycle - 1)),
+                amount=member.total_rent,
+            )
+            for cycle in range(1, cycles + 1)
+        )
+        member.charged_amount = member.total_rent * cycles
+        member.charged_cycles = cycles
+        members.append(member)
+    RentCharge.objects.bulk_create(charges, batch_size=500)
+    Register.objects.bulk_update(members, ['charged_amount', 'charged_cycles'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='register',
+            name='charged_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='register',
+            name='charged_cycles',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='RentCharge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cycle_number', models.PositiveIntegerField()),
+                ('cycle_start', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='charges', to='hostel.register')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['member', 'cycle_start'], name='hostel_charge_member_start_idx')],
+                'constraints': [models.UniqueConstraint(fields=('member', 'cycle_number'), name='hostel_charge_member_cycle_uniq')],
+            },
+        ),
+        migrations.RunPython(bill_existing_members, migrations.RunPython.noop),
+    ]
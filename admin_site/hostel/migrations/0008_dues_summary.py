@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0007_rent_charges'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FloorDues',
+            fields=[
+                ('floor', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('rooms', models.PositiveIntegerField(default=0)),
+                ('active_members', models.PositiveIntegerField(default=0)),
+                ('expected_rent', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('collected', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('as_of', models.DateField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RoomDues',
+            fields=[
+                ('room', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dues', serialize=False, to='hostel.room')),
+                ('floor', models.PositiveIntegerField()),
+                ('active_members', models.PositiveIntegerField(default=0)),
+                ('expected_rent', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('collected', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('as_of', models.DateField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['floor', 'outstanding'], name='hostel_room_dues_floor_idx')],
+            },
+        ),
+    ]
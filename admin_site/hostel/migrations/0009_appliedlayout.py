@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0008_dues_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppliedLayout',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('digest', models.CharField(max_length=64)),
+                ('applied_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
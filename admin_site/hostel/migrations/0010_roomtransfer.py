@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0009_appliedlayout'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomTransfer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('move', 'Move'), ('swap', 'Swap'), ('bulk_move', 'Bulk move')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('from_room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='hostel.room')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_transfers', to='hostel.register')),
+                ('performed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('to_room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='hostel.room')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['member', 'created_at'], name='hostel_transfer_member_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0011_payment_date_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_on', models.DateField()),
+                ('room_number', models.CharField(blank=True, max_length=10)),
+                ('floor', models.PositiveIntegerField(null=True)),
+                ('is_active', models.BooleanField()),
+                ('expected', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('paid', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='hostel.register')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['member', 'taken_on'], name='hostel_balsnap_member_idx')],
+                'constraints': [models.UniqueConstraint(fields=('taken_on', 'member'), name='hostel_balsnap_day_member_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OccupancySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_on', models.DateField()),
+                ('floor', models.PositiveIntegerField()),
+                ('capacity', models.PositiveIntegerField()),
+                ('occupied', models.PositiveIntegerField()),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy_snapshots', to='hostel.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('taken_on', 'room'), name='hostel_occsnap_day_room_uniq')],
+            },
+        ),
+    ]
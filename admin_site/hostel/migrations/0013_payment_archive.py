@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0012_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPayment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('amount', models.PositiveIntegerField()),
+                ('payment_date', models.DateField()),
+                ('notes', models.CharField(blank=True, max_length=255, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_payments', to='hostel.register')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['member', 'payment_date'], name='hostel_archpay_member_date_idx'), models.Index(fields=['payment_date', 'id'], name='hostel_archpay_date_id_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OpeningBalance',
+            fields=[
+                ('member', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='opening_balance', serialize=False, to='hostel.register')),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('payments', models.PositiveIntegerField(default=0)),
+                ('through_date', models.DateField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0013_payment_archive'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='register',
+            name='balance_snapshot',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.AlterField(
+            model_name='register',
+            name='last_payment_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='register',
+            name='paid_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+    ]
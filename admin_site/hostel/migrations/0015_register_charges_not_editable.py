@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0014_register_ledger_not_editable'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='register',
+            name='charged_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='register',
+            name='charged_cycles',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
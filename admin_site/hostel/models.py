@@ -1,23 +1,133 @@
-from django.db import models
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
 from django.utils import timezone
 from datetime import date, timedelta
-from django.db.models import Sum
+from django.db.models import Sum, Max, F, Q, Value, OuterRef, Subquery, ExpressionWrapper, Case, When
+from django.db.models.functions import Coalesce, Greatest
+from django.dispatch import Signal
 from django.utils.timezone import now
 
 
+RENT_CYCLE_DAYS = 30
+
+# Denormalized payment ledger on Register; written only through RegisterQuerySet.adjust_ledger()
+LEDGER_FIELDS = ('paid_amount', 'last_payment_date', 'balance_snapshot')
+
+# Totals of the RentCharge rows of a member; written only through RegisterQuerySet.refresh_charges()
+CHARGE_FIELDS = ('charged_amount', 'charged_cycles')
+
+# Sent with room_ids when members change rooms through a queryset update (no post_save fires)
+rooms_reassigned = Signal()
+
+
+def rent_cycles_between(joined_date, as_of):
+    """Number of 30-day rent cycles started between joined_date and as_of (current cycle included)"""
+    days_stayed = (as_of - joined_date).days
+    if days_stayed < 0:
+        return 0
+    return (days_stayed // RENT_CYCLE_DAYS) + 1
+
+
+class RentCycles(models.Func):
+    """SQL twin of rent_cycles_between(); as_of may be a date or a date expression"""
+    output_field = models.IntegerField()
+
+    def __init__(self, joined_date, as_of, **extra):
+        if isinstance(as_of, date):
+            as_of = Value(as_of, output_field=models.DateField())
+        super().__init__(joined_date, as_of, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        joined_sql, joined_params = compiler.compile(self.source_expressions[0])
+        as_of_sql, as_of_params = compiler.compile(self.source_expressions[1])
+        if connection.vendor == 'sqlite':
+            days = f"CAST(julianday({as_of_sql}) - julianday({joined_sql}) AS INTEGER)"
+        elif connection.vendor == 'mysql':
+            days = f"DATEDIFF({as_of_sql}, {joined_sql})"
+        else:
+            days = f"(CAST({as_of_sql} AS DATE) - {joined_sql})"
+        div = 'DIV' if connection.vendor == 'mysql' else '/'
+        sql = f"CASE WHEN {days} < 0 THEN 0 ELSE ({days} {div} {RENT_CYCLE_DAYS}) + 1 END"
+        params = (list(as_of_params) + list(joined_params)) * 2
+        return sql, params
+
+
+class AppliedLayout(models.Model):
+    """Digest of the declarative layout last applied to the database (see hostel.scripts.populate_rooms)"""
+    ROOMS = 'rooms'
+
+    name = models.CharField(max_length=50, primary_key=True)
+    digest = models.CharField(max_length=64)
+    applied_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} layout {self.digest[:12]}"
+
+
+class DataVersion(models.Model):
+    """Write-version token of one scope of the AJAX data, shared by every worker (see hostel.services.versions)"""
+    scope = models.CharField(max_length=50, primary_key=True)
+    version = models.CharField(max_length=20)
+
+    def __str__(self):
+        return f"{self.scope} @ {self.version}"
+
+
+class RoomQuerySet(models.QuerySet):
+    def shift_occupancy(self, deltas):
+        """Apply {room_id: delta} to occupied_count, refusing any increase past capacity.
+
+        Each increase is a single conditional UPDATE, so two concurrent moves into the
+        last free bed cannot both succeed. All decreases share one UPDATE and are applied
+        first. Call inside a transaction so a refusal rolls back the whole move.
+        """
+        releases = {room_id: -delta for room_id, delta in deltas.items() if room_id is not None and delta < 0}
+        if releases:
+            self.filter(pk__in=releases).update(occupied_count=Case(
+                *[
+                    When(
+                        pk=room_id,
+                        occupied_count__gte=count,
+                        then=ExpressionWrapper(F('occupied_count') - count, output_field=models.PositiveIntegerField()),
+                    )
+                    for room_id, count in releases.items()
+                ],
+                default=F('occupied_count'),
+            ))
+        for room_id, delta in deltas.items():
+            if room_id is None or delta <= 0:
+                continue
+            claimed = self.filter(pk=room_id, occupied_count__lte=F('capacity') - delta).update(
+                occupied_count=F('occupied_count') + delta
+            )
+            if not claimed:
+                room = self.filter(pk=room_id).values_list('room_number', flat=True).first()
+                raise ValidationError(f"Room {room} does not have {delta} free bed(s).")
+
+
 class Room(models.Model):
     room_number = models.CharField(max_length=10, unique=True)
     floor = models.PositiveIntegerField()
     capacity = models.PositiveIntegerField()
     rent = models.PositiveIntegerField()
     has_attached_washroom = models.BooleanField(default=False)
+    # Active members in the room; maintained by Register.save() and RoomQuerySet.shift_occupancy()
+    occupied_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = RoomQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.room_number}"
 
     @property
     def available_slots(self):
-        return self.capacity - self.register_set.count()
+        return self.capacity - self.occupied_count
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['floor', 'room_number'], name='hostel_room_floor_number_idx'),
+        ]
 
     def get_current_members(self):
         return self.register_set.filter(is_active=True)
@@ -26,6 +136,182 @@ class Room(models.Model):
         return sum(member.get_balance() for member in self.get_current_members())
 
 
+def _member_total(model, **filters):
+    """Subquery body: sum of the outer member's rows of Payment/ArchivedPayment matching filters"""
+    return (
+        model.objects.filter(member=OuterRef('pk'), **filters)
+        .order_by()
+        .values('member')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+
+
+# Rent of each cycle not billed yet: only active members accrue. _rent_owed() needs it as an alias
+ACCRUING_RENT = Case(
+    When(is_active=True, then=F('total_rent')),
+    default=Value(0),
+    output_field=models.DecimalField(max_digits=12, decimal_places=2),
+)
+
+
+def _rent_owed(as_of):
+    """Rent billed plus rent not billed yet as of `as_of`, a date or the name of a date column.
+
+    Cycles are billed 1..n without gaps, so that is the sum of (charge - accruing rent) over the
+    charges up to as_of plus accruing rent x cycles started: a single RentCharge subquery.
+    """
+    money = models.DecimalField(max_digits=12, decimal_places=2)
+    inner, outer = (OuterRef(as_of), F(as_of)) if isinstance(as_of, str) else (as_of, as_of)
+    owed = (
+        RentCharge.objects.filter(member=OuterRef('pk'), cycle_start__lte=inner)
+        .order_by()
+        .values('member')
+        .annotate(owed=Sum(F('amount') - OuterRef('accruing_rent'), output_field=money))
+        .values('owed')
+    )
+    return ExpressionWrapper(
+        Coalesce(Subquery(owed, output_field=money), Value(0), output_field=money)
+        + F('accruing_rent') * RentCycles('joined_date', outer),
+        output_field=money,
+    )
+
+
+class RegisterQuerySet(models.QuerySet):
+    def with_balances(self, as_of=None):
+        """Annotate rent_cycles, billed_cycles, billed_total, expected_total, paid_total and balance in a single query.
+
+        Expected rent is what RentCharge has billed plus, for active members, the cycles
+        generate_charges has not caught up with yet. Current balances read the charged_amount
+        and paid_amount columns; historical ones (as_of given) sum charges and payments, archived
+        ones included, up to that date.
+        """
+        money = models.DecimalField(max_digits=12, decimal_places=2)
+        if as_of is None:
+            as_of = now().date()
+            billed_total, billed_cycles = F('charged_amount'), F('charged_cycles')
+            expected_total = F('billed_total') + Case(
+                When(
+                    rent_cycles__gt=F('billed_cycles'),
+                    then=ExpressionWrapper(F('accruing_rent') * (F('rent_cycles') - F('billed_cycles')), output_field=money),
+                ),
+                default=Value(0),
+                output_field=money,
+            )
+            paid_total = F('paid_amount')
+        else:
+            charges = RentCharge.objects.filter(member=OuterRef('pk'), cycle_start__lte=as_of).order_by().values('member')
+            billed_total = Coalesce(
+                Subquery(charges.annotate(total=Sum('amount')).values('total'), output_field=money),
+                Value(0), output_field=money,
+            )
+            billed_cycles = Coalesce(
+                Subquery(charges.annotate(last=Max('cycle_number')).values('last')),
+                Value(0), output_field=models.IntegerField(),
+            )
+            # Not built on billed_total/billed_cycles: Django would inline both subqueries again
+            # wherever expected_total and balance are used
+            expected_total = _rent_owed(as_of)
+            live, archived = (
+                Coalesce(Subquery(_member_total(model, payment_date__lte=as_of), output_field=money), Value(0), output_field=money)
+                for model in (Payment, ArchivedPayment)
+            )
+            # Read through to the archive, which holds the older payments
+            paid_total = live + archived
+        return self.alias(accruing_rent=ACCRUING_RENT).annotate(
+            rent_cycles=RentCycles('joined_date', as_of),
+            billed_cycles=ExpressionWrapper(billed_cycles, output_field=models.IntegerField()),
+            billed_total=ExpressionWrapper(billed_total, output_field=money),
+            expected_total=ExpressionWrapper(expected_total, output_field=money),
+            paid_total=ExpressionWrapper(paid_total, output_field=money),
+            balance=ExpressionWrapper(F('expected_total') - F('paid_total'), output_field=money),
+        )
+
+    def generate_charges(self, as_of=None, batch_size=500):
+        """Create the missing RentCharge rows of the active members in the queryset up to as_of.
+
+        Idempotent: members already billed up to as_of are filtered out in SQL, and the
+        (member, cycle_number) constraint drops any cycle that was billed concurrently.
+        Returns (members billed, charges created, amount billed).
+        """
+        as_of = as_of or now().date()
+        pending = list(
+            self.filter(is_active=True)
+            .annotate(due_cycles=RentCycles('joined_date', as_of))
+            .filter(due_cycles__gt=F('charged_cycles'))
+            .order_by('pk')
+            .values_list('pk', 'joined_date', 'total_rent', 'charged_cycles', 'due_cycles')
+        )
+        created, amount = 0, 0
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            charges = [
+                RentCharge(
+                    member_id=pk,
+                    cycle_number=cycle,
+                    cycle_start=joined + timedelta(days=RENT_CYCLE_DAYS * (cycle - 1)),
+                    amount=rent,
+                )
+                for pk, joined, rent, charged, due in batch
+                for cycle in range(charged + 1, due + 1)
+            ]
+            with transaction.atomic():
+                RentCharge.objects.bulk_create(charges, batch_size=batch_size, ignore_conflicts=True)
+                Register.objects.filter(pk__in=[row[0] for row in batch]).refresh_charges()
+            created += len(charges)
+            amount += sum(charge.amount for charge in charges)
+        return len(pending), created, amount
+
+    def refresh_charges(self):
+        """Recompute charged_amount/charged_cycles of every member in the queryset from RentCharge in one UPDATE"""
+        charges = RentCharge.objects.filter(member=OuterRef('pk')).order_by().values('member')
+        money = models.DecimalField(max_digits=12, decimal_places=2)
+        return self.update(
+            charged_amount=Coalesce(
+                Subquery(charges.annotate(total=Sum('amount')).values('total'), output_field=money),
+                Value(0), output_field=money,
+            ),
+            charged_cycles=Coalesce(
+                Subquery(charges.annotate(last=Max('cycle_number')).values('last')),
+                Value(0), output_field=models.IntegerField(),
+            ),
+        )
+
+    def adjust_ledger(self, delta=0):
+        """Shift paid_amount by delta and refresh last_payment_date/balance_snapshot"""
+        return self._update_ledger(F('paid_amount') + delta)
+
+    def refresh_ledger(self):
+        """Recompute the ledger columns of every member in the queryset from Payment plus the
+        member's OpeningBalance (the archived payments)"""
+        money = models.DecimalField(max_digits=12, decimal_places=2)
+        paid = Coalesce(Subquery(_member_total(Payment), output_field=money), Value(0), output_field=money)
+        opening = Subquery(OpeningBalance.objects.filter(member=OuterRef('pk')).values('paid'), output_field=money)
+        return self._update_ledger(paid + Coalesce(opening, Value(0), output_field=money))
+
+    def _update_ledger(self, paid):
+        money = models.DecimalField(max_digits=12, decimal_places=2)
+        live = Subquery(
+            Payment.objects.filter(member=OuterRef('pk'))
+            .order_by()
+            .values('member')
+            .annotate(last=Max('payment_date'))
+            .values('last'),
+            output_field=models.DateField(),
+        )
+        archived = Subquery(OpeningBalance.objects.filter(member=OuterRef('pk')).values('through_date'))
+        # Greatest() is NULL on SQLite when either side is, hence the fallbacks
+        last_payment = Coalesce(Greatest(live, archived), live, archived, output_field=models.DateField())
+        updated = self.update(paid_amount=paid, last_payment_date=last_payment)
+        # A second UPDATE, since the snapshot is the with_balances() figure as of the new last_payment_date
+        self.alias(accruing_rent=ACCRUING_RENT).update(balance_snapshot=Coalesce(
+            ExpressionWrapper(_rent_owed('last_payment_date') - F('paid_amount'), output_field=money),
+            Value(0),
+            output_field=money,
+        ))
+        return updated
+
+
 class Register(models.Model):
     first_name = models.CharField(max_length=50)
     sur_name = models.CharField(max_length=50)
@@ -45,9 +331,16 @@ class Register(models.Model):
         default='Unpaid'
     )
     total_rent = models.DecimalField(max_digits=10, decimal_places=2, default=0.0)
-    paid_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # Ledger and charge columns, maintained by RegisterQuerySet rather than typed in
+    paid_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+    last_payment_date = models.DateField(blank=True, null=True, editable=False)
+    balance_snapshot = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+    charged_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    charged_cycles = models.PositiveIntegerField(default=0, editable=False)
     joined_date = models.DateField(auto_now_add=True)
 
+    objects = RegisterQuerySet.as_manager()
+
     def full_name(self):
         return f"{self.sur_name} {self.first_name}"
 
@@ -57,36 +350,291 @@ class Register(models.Model):
 
 
     def get_total_paid(self):
-        return Payment.objects.filter(member=self).aggregate(total=Sum('amount'))['total'] or 0
+        if hasattr(self, 'paid_total'):
+            return self.paid_total
+        return self.paid_amount
 
     def get_total_due(self):
-        """Return the total expected rent till now based on 30-day cycles"""
-        today = date.today()
-        days_stayed = (today - self.joined_date).days
-        cycles = (days_stayed // 30) + 1
-        return self.total_rent * cycles
+        """Return the rent billed so far plus any 30-day cycles not yet billed to an active member"""
+        if hasattr(self, 'expected_total'):
+            return self.expected_total
+        due = self.charged_amount
+        if self.is_active:
+            unbilled = rent_cycles_between(self.joined_date, now().date()) - self.charged_cycles
+            due += self.total_rent * max(unbilled, 0)
+        return due
 
     def get_balance(self):
-        """Accurate balance: rent * cycles - total paid"""
-        from django.utils.timezone import now
-        today = now().date()
-        days_stayed = (today - self.joined_date).days
-        rent_cycles = (days_stayed // 30) + 1  # Always count current cycle
-        expected_total = self.total_rent * rent_cycles
-
-        paid_total = Payment.objects.filter(member=self).aggregate(
-            total=Sum('amount'))['total'] or 0
-
-        return expected_total - paid_total
-    
+        """Accurate balance: rent due - total paid"""
+        if hasattr(self, 'balance'):
+            return self.balance
+        return self.get_total_due() - self.paid_amount
+
+    def occupied_room_id(self):
+        return self.room_id if self.is_active else None
+
     def save(self, *args, **kwargs):
         if self.room and not self.total_rent:
             self.total_rent = self.room.rent
-        super().save(*args, **kwargs)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Never write back a stale copy of the ledger; Payment and RentCharge keep it current
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in LEDGER_FIELDS + CHARGE_FIELDS
+            ]
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    Register.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values('room_id', 'is_active', *MemberSearchToken.SOURCE_FIELDS)
+                    .first()
+                )
+            if previous and previous['is_active'] and not self.is_active:
+                # Bill the cycles started before vacating; inactive members stop accruing rent
+                Register.objects.filter(pk=self.pk).generate_charges()
+                self.charged_amount, self.charged_cycles = (
+                    Register.objects.filter(pk=self.pk).values_list(*CHARGE_FIELDS).get()
+                )
+            # Read by the post_save handlers that refresh the dues of the room the member left
+            self._previous_room_id = previous['room_id'] if previous else None
+            previous_room_id = previous['room_id'] if previous and previous['is_active'] else None
+            new_room_id = self.occupied_room_id()
+            if previous_room_id != new_room_id:
+                Room.objects.shift_occupancy({previous_room_id: -1, new_room_id: 1})
+            super().save(*args, **kwargs)
+            if previous is None or any(previous[f] != getattr(self, f) for f in MemberSearchToken.SOURCE_FIELDS):
+                MemberSearchToken.reindex(self)
+
+    def swap_rooms(self, other):
+        """Exchange rooms with another member; occupancy only changes if one of them is inactive"""
+        with transaction.atomic():
+            current = {
+                row['pk']: row
+                for row in Register.objects.select_for_update()
+                .filter(pk__in=[self.pk, other.pk])
+                .values('pk', 'room_id', 'is_active')
+            }
+            mine, theirs = current[self.pk], current[other.pk]
+            deltas = {}
+            for member, old_room, new_room in ((mine, mine['room_id'], theirs['room_id']),
+                                               (theirs, theirs['room_id'], mine['room_id'])):
+                if member['is_active']:
+                    deltas[old_room] = deltas.get(old_room, 0) - 1
+                    deltas[new_room] = deltas.get(new_room, 0) + 1
+            Room.objects.shift_occupancy(deltas)
+            Register.objects.filter(pk=self.pk).update(room_id=theirs['room_id'])
+            Register.objects.filter(pk=other.pk).update(room_id=mine['room_id'])
+            self.room_id, other.room_id = theirs['room_id'], mine['room_id']
+            rooms_reassigned.send(sender=Register, room_ids={mine['room_id'], theirs['room_id']})
 
     class Meta:
         verbose_name = "Add Member"
         verbose_name_plural = "Add Members"
+        indexes = [
+            # Vacate, balance and availability screens: active members of a room
+            models.Index(fields=['room', 'is_active'], name='hostel_reg_room_active_idx'),
+            # Member pickers only ever list active members, by name
+            models.Index(
+                fields=['sur_name', 'first_name'],
+                condition=models.Q(is_active=True),
+                name='hostel_reg_active_name_idx',
+            ),
+            models.Index(fields=['payment_status'], name='hostel_reg_pay_status_idx'),
+            models.Index(fields=['joined_date'], name='hostel_reg_joined_idx'),
+        ]
+
+
+class RoomTransfer(models.Model):
+    """Audit row for every room change made through hostel.services.transfers.RoomTransferService"""
+    MOVE, SWAP, BULK_MOVE = 'move', 'swap', 'bulk_move'
+    KIND_CHOICES = [(MOVE, 'Move'), (SWAP, 'Swap'), (BULK_MOVE, 'Bulk move')]
+
+    member = models.ForeignKey(Register, on_delete=models.CASCADE, related_name='room_transfers')
+    from_room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    to_room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    performed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['member', 'created_at'], name='hostel_transfer_member_idx')]
+
+    def __str__(self):
+        return f"{self.member.full_name()}: {self.from_room or '-'} -> {self.to_room or '-'} ({self.kind})"
+
+
+class RoomDues(models.Model):
+    """Materialized dues of the active members of a room; kept current by hostel.services.dues"""
+    room = models.OneToOneField(Room, on_delete=models.CASCADE, primary_key=True, related_name='dues')
+    floor = models.PositiveIntegerField()
+    active_members = models.PositiveIntegerField(default=0)
+    expected_rent = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    collected = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    outstanding = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    as_of = models.DateField()
+
+    class Meta:
+        indexes = [models.Index(fields=['floor', 'outstanding'], name='hostel_room_dues_floor_idx')]
+
+    def __str__(self):
+        return f"Room {self.room_id} dues as of {self.as_of}"
+
+
+class FloorDues(models.Model):
+    """Per-floor totals of RoomDues; as_of is the oldest room figure they include"""
+    floor = models.PositiveIntegerField(primary_key=True)
+    rooms = models.PositiveIntegerField(default=0)
+    active_members = models.PositiveIntegerField(default=0)
+    expected_rent = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    collected = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    outstanding = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    as_of = models.DateField()
+
+    def __str__(self):
+        return f"Floor {self.floor} dues as of {self.as_of}"
+
+
+class RentCharge(models.Model):
+    """Rent billed to a member for one 30-day cycle; created by Register.objects.generate_charges()"""
+    member = models.ForeignKey(Register, on_delete=models.CASCADE, related_name='charges')
+    cycle_number = models.PositiveIntegerField()
+    cycle_start = models.DateField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['member', 'cycle_number'], name='hostel_charge_member_cycle_uniq'),
+        ]
+        indexes = [models.Index(fields=['member', 'cycle_start'], name='hostel_charge_member_start_idx')]
+
+    def __str__(self):
+        return f"{self.member.full_name()} - cycle {self.cycle_number} from {self.cycle_start}: ₹{self.amount}"
+
+
+class ArchivedPayment(models.Model):
+    """A payment moved out of Payment by hostel.services.archive, keeping its id; read-only history"""
+    id = models.BigIntegerField(primary_key=True)
+    member = models.ForeignKey(Register, on_delete=models.CASCADE, related_name='archived_payments')
+    amount = models.PositiveIntegerField()
+    payment_date = models.DateField()
+    notes = models.CharField(max_length=255, blank=True, null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['member', 'payment_date'], name='hostel_archpay_member_date_idx'),
+            models.Index(fields=['payment_date', 'id'], name='hostel_archpay_date_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.member.full_name()} - ₹{self.amount} on {self.payment_date} (archived)"
+
+
+class OpeningBalance(models.Model):
+    """Running total of a member's archived payments, so the ledger never has to read the archive"""
+    member = models.OneToOneField(Register, on_delete=models.CASCADE, primary_key=True, related_name='opening_balance')
+    paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    payments = models.PositiveIntegerField(default=0)
+    through_date = models.DateField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Member {self.member_id}: ₹{self.paid} archived through {self.through_date}"
+
+
+class BalanceSnapshot(models.Model):
+    """A member's balance at the end of one day; append-only, written by hostel.services.snapshots"""
+    taken_on = models.DateField()
+    member = models.ForeignKey(Register, on_delete=models.CASCADE, related_name='balance_snapshots')
+    room_number = models.CharField(max_length=10, blank=True)
+    floor = models.PositiveIntegerField(null=True)
+    is_active = models.BooleanField()
+    expected = models.DecimalField(max_digits=12, decimal_places=2)
+    paid = models.DecimalField(max_digits=12, decimal_places=2)
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['taken_on', 'member'], name='hostel_balsnap_day_member_uniq'),
+        ]
+        indexes = [models.Index(fields=['member', 'taken_on'], name='hostel_balsnap_member_idx')]
+
+    def __str__(self):
+        return f"Member {self.member_id} owed ₹{self.balance} on {self.taken_on}"
+
+
+class OccupancySnapshot(models.Model):
+    """A room's occupancy at the end of one day; append-only, written by hostel.services.snapshots"""
+    taken_on = models.DateField()
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='occupancy_snapshots')
+    floor = models.PositiveIntegerField()
+    capacity = models.PositiveIntegerField()
+    occupied = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['taken_on', 'room'], name='hostel_occsnap_day_room_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Room {self.room_id}: {self.occupied}/{self.capacity} on {self.taken_on}"
+
+
+def normalize_search_text(value):
+    return " ".join((value or "").lower().split())
+
+
+class MemberSearchToken(models.Model):
+    """Lowercased name/phone/Aadhaar prefixes of a member, searched with indexed range scans"""
+    SOURCE_FIELDS = ('first_name', 'sur_name', 'contact_number', 'aadhar_number')
+    WEIGHTS = {'sur_name': 4, 'first_name': 3, 'contact_number': 1, 'aadhar_number': 1}
+
+    member = models.ForeignKey(Register, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=50)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [models.Index(fields=['token', 'member'], name='hostel_search_token_idx')]
+
+    def __str__(self):
+        return self.token
+
+    @classmethod
+    def tokens_for(cls, member):
+        tokens = {}
+        for field in cls.SOURCE_FIELDS:
+            value = getattr(member, field)
+            if field in ('contact_number', 'aadhar_number'):
+                words = ["".join(ch for ch in (value or "") if ch.isdigit())]
+            else:
+                words = normalize_search_text(value).split()
+            for word in words:
+                if word:
+                    word = word[:50]
+                    tokens[word] = max(tokens.get(word, 0), cls.WEIGHTS[field])
+        return tokens
+
+    @classmethod
+    def reindex(cls, member):
+        cls.objects.filter(member=member).delete()
+        cls.objects.bulk_create(
+            cls(member=member, token=token, weight=weight)
+            for token, weight in cls.tokens_for(member).items()
+        )
+
+
+class PaymentQuerySet(models.QuerySet):
+    def with_member_balance(self, as_of=None):
+        """Annotate each payment with its member's current balance (member_balance) via a PK subquery"""
+        balance = Register.objects.filter(pk=OuterRef('member_id')).with_balances(as_of).values('balance')
+        return self.annotate(
+            member_balance=Subquery(balance, output_field=models.DecimalField(max_digits=12, decimal_places=2))
+        )
 
 
 class Payment(models.Model):
@@ -95,16 +643,33 @@ class Payment(models.Model):
     payment_date = models.DateField(default=timezone.now)
     notes = models.CharField(max_length=255, blank=True, null=True)
 
+    objects = PaymentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['member', 'payment_date'], name='hostel_pay_member_date_idx'),
+            # Payment history pages seek on (payment_date, id)
+            models.Index(fields=['payment_date', 'id'], name='hostel_pay_date_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.member.full_name()} - ₹{self.amount} on {self.payment_date}"
 
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # After saving payment, update paid_amount field
-        total_paid = Payment.objects.filter(member=self.member).aggregate(total=models.Sum('amount'))['total'] or 0
-        self.member.paid_amount = total_paid
-        self.member.save()
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = Payment.objects.filter(pk=self.pk).values('member_id', 'amount').first()
+            self._previous_member_id = previous['member_id'] if previous else None
+            super().save(*args, **kwargs)
+            # Post the difference to the member ledger instead of re-summing the history
+            if previous and previous['member_id'] != self.member_id:
+                Register.objects.filter(pk=previous['member_id']).adjust_ledger(-previous['amount'])
+                Register.objects.filter(pk=self.member_id).adjust_ledger(self.amount)
+            else:
+                delta = self.amount - (previous['amount'] if previous else 0)
+                Register.objects.filter(pk=self.member_id).adjust_ledger(delta)
 
 
 # ✅ Proxy Models for Custom Admin Views (unchanged)
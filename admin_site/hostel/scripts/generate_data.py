@@ -0,0 +1,140 @@
+"""Synthetic hostel data for benchmarks: rooms from populate_rooms, members and years of payments.
+
+Members are bulk-inserted, so everything Register.save() and Payment.save() normally maintain
+(occupancy, search tokens, rent charges, ledger and dues summaries) is rebuilt set-based at the end.
+"""
+import math
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+
+from hostel.models import RENT_CYCLE_DAYS, MemberSearchToken, Payment, Register, RentCharge, Room
+from hostel.scripts.populate_rooms import FLOOR_TEMPLATE, layout_spec, room_layout, run as populate_rooms
+from hostel.services.dues import refresh_dues
+
+FIRST_NAMES = [
+    'Aarav', 'Aditya', 'Akhil', 'Anil', 'Arjun', 'Bharath', 'Chaitanya', 'Deepak', 'Ganesh', 'Gopi',
+    'Hari', 'Karthik', 'Kiran', 'Krishna', 'Mahesh', 'Manoj', 'Naveen', 'Pavan', 'Prasad', 'Rahul',
+    'Rajesh', 'Ravi', 'Sai', 'Sandeep', 'Santosh', 'Srinivas', 'Suresh', 'Teja', 'Venkat', 'Vijay',
+]
+SUR_NAMES = [
+    'Reddy', 'Rao', 'Naidu', 'Chowdary', 'Sharma', 'Varma', 'Kumar', 'Goud', 'Yadav', 'Raju',
+    'Murthy', 'Prasad', 'Shetty', 'Nair', 'Iyer', 'Patel', 'Gupta', 'Kurra', 'Kondapalli', 'Bandi',
+]
+JOBS = ['Study', 'Software Engineer', 'Student', 'Bank Employee', 'Teacher', 'Intern']
+
+# Share of members per payment habit: (probability of paying a cycle, probability of paying it in full)
+PAYERS = [(0.75, (0.97, 0.9)), (0.2, (0.8, 0.6)), (0.05, (0.3, 0.5))]
+
+
+def _payer(rng):
+    roll = rng.random()
+    for share, habit in PAYERS:
+        if roll < share:
+            return habit
+        roll -= share
+    return PAYERS[-1][1]
+
+
+def generate(members=1000, floors=6, rooms_per_floor=None, years=1, vacated_ratio=0.2, seed=42):
+    """Seed rooms, members (active and vacated) and payments; returns a dict of row counts.
+
+    rooms_per_floor defaults to just enough beds for the active members at 90% occupancy.
+    """
+    rng = random.Random(seed)
+    today = now().date()
+    history_days = int(365 * years)
+    active_count = members - int(members * vacated_ratio)
+
+    if rooms_per_floor is None:
+        beds_per_room = sum(capacity for capacity, _ in FLOOR_TEMPLATE) / len(FLOOR_TEMPLATE)
+        rooms_needed = math.ceil(active_count / 0.9 / beds_per_room)
+        rooms_per_floor = max(len(FLOOR_TEMPLATE), math.ceil(rooms_needed / floors))
+
+    with transaction.atomic():
+        spec = layout_spec(floors, rooms_per_floor)
+        populate_rooms(spec)
+        rooms = list(Room.objects.filter(room_number__in=list(room_layout(spec))).order_by('room_number'))
+        beds = [room for room in rooms for _ in range(room.capacity - room.occupied_count)]
+        rng.shuffle(beds)
+        active_count = min(active_count, len(beds))
+
+        new_members, joined, left = [], [], []
+        for i in range(members):
+            active = i < active_count
+            room = beds[i] if active else None
+            if active:
+                join = today - timedelta(days=rng.randint(0, history_days))
+                leave = None
+            else:
+                join = today - timedelta(days=rng.randint(RENT_CYCLE_DAYS, history_days + RENT_CYCLE_DAYS))
+                leave = join + timedelta(days=rng.randint(RENT_CYCLE_DAYS, max(RENT_CYCLE_DAYS, (today - join).days)))
+            rent = (room.rent if room else rng.choice(rooms).rent)
+            new_members.append(Register(
+                first_name=rng.choice(FIRST_NAMES), sur_name=rng.choice(SUR_NAMES),
+                contact_number=f"9{rng.randint(100000000, 999999999)}",
+                aadhar_number=f"{rng.randint(10 ** 11, 10 ** 12 - 1)}",
+                guardian_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(SUR_NAMES)}",
+                guardian_contact_number=f"8{rng.randint(100000000, 999999999)}",
+                job_or_study=rng.choice(JOBS), room=room, total_rent=rent, is_active=active,
+                advance_amount=rng.choice([0, rent]),
+            ))
+            joined.append(join)
+            left.append(leave)
+
+        new_members = Register.objects.bulk_create(new_members, batch_size=500)
+        # joined_date is auto_now_add, so it can only be back-dated after the insert
+        for member, join in zip(new_members, joined):
+            member.joined_date = join
+        Register.objects.bulk_update(new_members, ['joined_date'], batch_size=500)
+
+        payments, charges = [], []
+        for member, join, leave in zip(new_members, joined, left):
+            pays, full = _payer(rng)
+            end = leave or today
+            cycle_start, cycle = join, 1
+            while cycle_start <= end:
+                if not member.is_active:
+                    charges.append(RentCharge(
+                        member=member, cycle_number=cycle, cycle_start=cycle_start, amount=member.total_rent,
+                    ))
+                if rng.random() < pays:
+                    amount = member.total_rent if rng.random() < full else int(member.total_rent * rng.choice([0.25, 0.5, 0.75]))
+                    paid_on = min(cycle_start + timedelta(days=rng.randint(0, 10)), today)
+                    payments.append(Payment(member=member, amount=amount, payment_date=paid_on))
+                cycle_start += timedelta(days=RENT_CYCLE_DAYS)
+                cycle += 1
+        Payment.objects.bulk_create(payments, batch_size=1000)
+        RentCharge.objects.bulk_create(charges, batch_size=1000)
+
+        MemberSearchToken.objects.bulk_create(
+            (
+                MemberSearchToken(member=member, token=token, weight=weight)
+                for member in new_members
+                for token, weight in MemberSearchToken.tokens_for(member).items()
+            ),
+            batch_size=1000,
+        )
+        member_ids = [member.pk for member in new_members]
+        seeded = Register.objects.filter(pk__in=member_ids)
+        seeded.filter(is_active=False).refresh_charges()
+        seeded.generate_charges()
+        seeded.refresh_ledger()
+        occupied = (
+            Register.objects.filter(room=OuterRef('pk'), is_active=True)
+            .order_by().values('room').annotate(n=Count('id')).values('n')
+        )
+        Room.objects.update(occupied_count=Coalesce(Subquery(occupied), 0))
+        refresh_dues()
+
+    return {
+        'rooms': len(rooms),
+        'members': len(new_members),
+        'active': active_count,
+        'payments': len(payments),
+        'charges': RentCharge.objects.filter(member_id__in=member_ids).count(),
+    }
@@ -0,0 +1,122 @@
+"""Closed-loop HTTP load test of the dashboard API, standard library only.
+
+Start the site under an ASGI server, then point this at it, e.g.:
+
+    uvicorn Shanmukha_project.asgi:application --port 8000
+    python -m hostel.scripts.load_test --base-url http://127.0.0.1:8000 --username admin --password ... \\
+        --concurrency 100 --duration 20
+
+Each of the --concurrency clients keeps one HTTP/1.1 connection open and requests the --path URLs
+in turn, like a wall display polling the dashboard. Pass the sync AJAX URLs (e.g. /ajax/get-room-rent/1/)
+or run against a WSGI server to compare.
+"""
+import argparse
+import asyncio
+import http.cookiejar
+import re
+import statistics
+import time
+import urllib.parse
+import urllib.request
+from collections import Counter
+
+DEFAULT_PATHS = ['/api/occupancy/', '/api/floors/', '/api/collections/today/']
+
+
+def login(base_url, username, password):
+    """Log in through the admin login form; returns the Cookie header to send"""
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    login_url = urllib.parse.urljoin(base_url, '/admin/login/')
+    page = opener.open(login_url).read().decode()
+    token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', page).group(1)
+    body = urllib.parse.urlencode({
+        'csrfmiddlewaretoken': token, 'username': username, 'password': password, 'next': '/admin/',
+    }).encode()
+    opener.open(urllib.request.Request(login_url, data=body, headers={'Referer': login_url}))
+    cookies = {cookie.name: cookie.value for cookie in jar}
+    if 'sessionid' not in cookies:
+        raise SystemExit("Login failed: check --username/--password")
+    return '; '.join(f'{name}={value}' for name, value in cookies.items())
+
+
+async def client(host, port, paths, cookie, deadline, results):
+    reader, writer = await asyncio.open_connection(host, port)
+    index = 0
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            request = f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: keep-alive\r\n'
+            if cookie:
+                request += f'Cookie: {cookie}\r\n'
+            started = time.perf_counter()
+            writer.write((request + '\r\n').encode())
+            await writer.drain()
+            status, close = await read_response(reader)
+            results.append((path, status, time.perf_counter() - started))
+            if close:
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+    finally:
+        writer.close()
+
+
+async def read_response(reader):
+    """Read one response; returns (status, server_closes_connection)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Server closed the connection")
+    status = int(status_line.split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding') == 'chunked':
+        while (size := int((await reader.readline()).split(b';')[0], 16)):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection', '').lower() == 'close'
+
+
+def report(results, elapsed, concurrency):
+    latencies = sorted(seconds * 1000 for _, _, seconds in results)
+    statuses = Counter(status for _, status, _ in results)
+    print(f"{len(results)} requests in {elapsed:.1f}s with {concurrency} clients: "
+          f"{len(results) / elapsed:.1f} req/s")
+    if latencies:
+        quantiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+        print(f"latency ms: median {statistics.median(latencies):.1f}  p95 {quantiles[94]:.1f}  "
+              f"p99 {quantiles[98]:.1f}  max {latencies[-1]:.1f}")
+    print("status codes: " + ', '.join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+    for path, count in sorted(Counter(path for path, _, _ in results).items()):
+        print(f"  {path:<40} {count}")
+
+
+async def main(options):
+    url = urllib.parse.urlsplit(options.base_url)
+    cookie = options.cookie
+    if options.username:
+        cookie = await asyncio.to_thread(login, options.base_url, options.username, options.password)
+    results = []
+    started = time.perf_counter()
+    deadline = started + options.duration
+    await asyncio.gather(*(
+        client(url.hostname, url.port or 80, options.path or DEFAULT_PATHS, cookie, deadline, results)
+        for _ in range(options.concurrency)
+    ))
+    report(results, time.perf_counter() - started, options.concurrency)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--path', action='append', help="URL path to request; repeat for several (default: the API)")
+    parser.add_argument('--concurrency', type=int, default=50, help="Simultaneous keep-alive clients")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds to run")
+    parser.add_argument('--username', help="Staff user to log in as")
+    parser.add_argument('--password')
+    parser.add_argument('--cookie', help="Raw Cookie header to send instead of logging in")
+    asyncio.run(main(parser.parse_args()))
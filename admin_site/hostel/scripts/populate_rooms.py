@@ -1,46 +1,81 @@
-from hostel.models import Room
-
-def run():
-    # Define basic data for 1st floor manually
-    base_rooms = {
-        101: {'capacity': 3, 'has_attached_washroom': True},
-        102: {'capacity': 3, 'has_attached_washroom': True},
-        103: {'capacity': 4, 'has_attached_washroom': True},
-        104: {'capacity': 1, 'has_attached_washroom': False},
-        105: {'capacity': 2, 'has_attached_washroom': True},
-        106: {'capacity': 5, 'has_attached_washroom': True},
-        107: {'capacity': 1, 'has_attached_washroom': False},
-        108: {'capacity': 2, 'has_attached_washroom': True},
-        109: {'capacity': 5, 'has_attached_washroom': True},
-        110: {'capacity': 2, 'has_attached_washroom': False},
-        111: {'capacity': 3, 'has_attached_washroom': True},
-        112: {'capacity': 5, 'has_attached_washroom': True},
-        113: {'capacity': 1, 'has_attached_washroom': False},
-        114: {'capacity': 3, 'has_attached_washroom': True},
-    }
-
-    # Copy same pattern for other floors with updated room numbers
+import hashlib
+import json
+
+from hostel.models import AppliedLayout, Room
+from hostel.services.versions import bump
+
+# Room pattern of a floor: (capacity, has_attached_washroom), numbered x01, x02, ... in this order
+FLOOR_TEMPLATE = [
+    (3, True), (3, True), (4, True), (1, False), (2, True), (5, True), (1, False),
+    (2, True), (5, True), (2, False), (3, True), (5, True), (1, False), (3, True),
+]
+
+RENT_BY_CAPACITY = {1: 7000, 2: 6500, 3: 6000}
+DEFAULT_RENT = 5500
+
+# Declarative room layout applied after every migrate. Each building repeats its floor template
+# on every floor; a prefix keeps room numbers unique when there is more than one building.
+LAYOUT = {
+    'buildings': [
+        {'prefix': '', 'floors': 6, 'rooms': FLOOR_TEMPLATE},
+    ],
+    'rent_by_capacity': RENT_BY_CAPACITY,
+    'default_rent': DEFAULT_RENT,
+}
+
+
+def layout_spec(floors=6, rooms_per_floor=None, prefix=''):
+    """Single-building spec with the standard floor template, cycled to rooms_per_floor rooms"""
+    rooms_per_floor = rooms_per_floor or len(FLOOR_TEMPLATE)
+    rooms = [FLOOR_TEMPLATE[index % len(FLOOR_TEMPLATE)] for index in range(rooms_per_floor)]
+    return {**LAYOUT, 'buildings': [{'prefix': prefix, 'floors': floors, 'rooms': rooms}]}
+
+
+def rent_for(capacity, spec=LAYOUT):
+    # JSON round-trips turn the capacity keys into strings
+    rents = {int(key): value for key, value in spec['rent_by_capacity'].items()}
+    return rents.get(capacity, spec['default_rent'])
+
+
+def room_layout(spec=LAYOUT):
+    """{room_number: info} for every room of the spec: 101 -> 201 ...; 100+ rooms a floor gives 1001, 2001, ..."""
     all_rooms = {}
-    for floor in range(1, 7):  # Floors 1 to 6
-        for base_number, room_info in base_rooms.items():
-            new_number = int(str(floor) + str(base_number)[1:])  # e.g., 101 -> 201
-            all_rooms[new_number] = {
-                'floor': floor,
-                'capacity': room_info['capacity'],
-                'has_attached_washroom': room_info['has_attached_washroom']
-            }
-
-    # Save rooms to DB
-    for number, info in all_rooms.items():
-        capacity = info['capacity']
-        rent = 7000 if capacity == 1 else 6500 if capacity == 2 else 6000 if capacity == 3 else 5500
-
-        Room.objects.update_or_create(
-            room_number=number,
-            defaults={
-                'floor': info['floor'],
-                'capacity': capacity,
-                'rent': rent,
-                'has_attached_washroom': info['has_attached_washroom']
-            }
-        )
+    for building in spec['buildings']:
+        width = 2 if len(building['rooms']) < 100 else 3
+        for floor in range(1, building['floors'] + 1):
+            for index, (capacity, washroom) in enumerate(building['rooms']):
+                all_rooms[f"{building.get('prefix', '')}{floor}{index + 1:0{width}d}"] = {
+                    'floor': floor,
+                    'capacity': capacity,
+                    'rent': rent_for(capacity, spec),
+                    'has_attached_washroom': washroom,
+                }
+    return all_rooms
+
+
+def layout_digest(spec=LAYOUT):
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def run(spec=LAYOUT):
+    """Upsert the rooms of the spec in one statement; no-op (a single SELECT) when it is already applied.
+
+    Rooms missing from the spec are left alone, since members may still reference them.
+    Returns the number of rooms written.
+    """
+    digest = layout_digest(spec)
+    if AppliedLayout.objects.filter(name=AppliedLayout.ROOMS, digest=digest).exists():
+        return 0
+
+    rooms = [Room(room_number=number, **info) for number, info in room_layout(spec).items()]
+    Room.objects.bulk_create(
+        rooms,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['room_number'],
+        update_fields=['floor', 'capacity', 'rent', 'has_attached_washroom'],
+    )
+    AppliedLayout.objects.update_or_create(name=AppliedLayout.ROOMS, defaults={'digest': digest})
+    # The upsert sends no post_save, so expire the room lookups' ETags here
+    bump('rooms')
+    return len(rooms)
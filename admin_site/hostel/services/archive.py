@@ -0,0 +1,105 @@
+"""Payment archival: moves settled history out of the hot Payment table.
+
+Payments of vacated members, and every payment older than the horizon, are copied to
+ArchivedPayment (same ids) and deleted from Payment; each member's OpeningBalance keeps their running
+total, so the ledger columns and current balances never read the archive. Historical queries
+(with_balances(as_of), the payment export, the /api/payments/ and collections endpoints) read
+through to it.
+
+The archive lives in the main database rather than a routed one: the read-through subqueries and
+the export's UNION need both tables on the same connection.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.utils.timezone import now
+
+from hostel.models import ArchivedPayment, OpeningBalance, Payment, Register
+from hostel.services.dashboard import invalidate_dashboard_stats
+from hostel.services.live import publish_changes
+
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def archivable_payments(horizon_days=None, today=None):
+    """Payments of vacated members plus every payment older than horizon_days (HOSTEL_ARCHIVE_HORIZON_DAYS)"""
+    if horizon_days is None:
+        horizon_days = getattr(settings, 'HOSTEL_ARCHIVE_HORIZON_DAYS', 730)
+    cutoff = (today or now().date()) - timedelta(days=horizon_days)
+    return Payment.objects.filter(Q(member__is_active=False) | Q(payment_date__lt=cutoff))
+
+
+def archive_summary(payments):
+    """Payments, members and amount the archival of `payments` would move"""
+    return payments.aggregate(
+        payments=Count('id'), members=Count('member', distinct=True), amount=Sum('amount', default=0),
+    )
+
+
+def archive_payments(payments=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move `payments` (default: archivable_payments()) to the archive, one transaction per batch.
+
+    Balances are unchanged: each batch is added to the members' OpeningBalance rows in the same
+    transaction as it leaves Payment. Returns the archive_summary() of what was moved.
+    """
+    payments = archivable_payments() if payments is None else payments
+    moved = {'payments': 0, 'members': set(), 'amount': 0}
+    while True:
+        with transaction.atomic():
+            batch = list(
+                payments.select_for_update().order_by('pk')
+                .values('id', 'member_id', 'amount', 'payment_date', 'notes')[:batch_size]
+            )
+            if not batch:
+                break
+            _move(batch)
+        moved['payments'] += len(batch)
+        moved['members'].update(row['member_id'] for row in batch)
+        moved['amount'] += sum(row['amount'] for row in batch)
+    moved['members'] = len(moved['members'])
+    return moved
+
+
+def _move(batch):
+    ids = [row['id'] for row in batch]
+    ArchivedPayment.objects.bulk_create(ArchivedPayment(**row) for row in batch)
+
+    member_ids = {row['member_id'] for row in batch}
+    openings = OpeningBalance.objects.select_for_update().in_bulk(member_ids)
+    for row in batch:
+        opening = openings.setdefault(row['member_id'], OpeningBalance(member_id=row['member_id']))
+        opening.paid += row['amount']
+        opening.payments += 1
+        opening.through_date = max(filter(None, [opening.through_date, row['payment_date']]))
+    OpeningBalance.objects.bulk_create(
+        openings.values(),
+        update_conflicts=True,
+        unique_fields=['member'],
+        update_fields=['paid', 'payments', 'through_date', 'updated_at'],
+    )
+
+    _delete_payments(ids)
+    Register.objects.filter(pk__in=member_ids).refresh_ledger()
+    # Balances are unchanged, so RoomDues need no refresh; the dashboard's payment figures and
+    # open dashboards are told here, since the DELETE sent no signals
+    transaction.on_commit(invalidate_dashboard_stats)
+    transaction.on_commit(lambda: publish_changes(member_ids=member_ids))
+
+
+def _delete_payments(ids):
+    """DELETE the Payment rows in one statement, without the pre/post_delete signals.
+
+    Payment's delete signals would take the amounts off the ledger, but they have only moved into
+    OpeningBalance; _move() re-derives the ledger from both and does the rest of the signals' work.
+    """
+    if not ids:
+        return
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {qn(Payment._meta.db_table)} WHERE {qn(Payment._meta.pk.column)} IN "
+            f"({', '.join(['%s'] * len(ids))})",
+            ids,
+        )
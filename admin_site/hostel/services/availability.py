@@ -0,0 +1,88 @@
+from itertools import groupby
+from operator import itemgetter
+
+from django.db.models import F
+
+from hostel.models import Register, Room
+
+
+def parse_availability_filters(params):
+    """Read floor / washroom / min_vacancy from a GET dict, dropping anything malformed"""
+    filters = {}
+    for name in ('floor', 'min_vacancy'):
+        try:
+            filters[name] = int(params.get(name))
+        except (TypeError, ValueError):
+            filters[name] = None
+    washroom = params.get('washroom')
+    filters['washroom'] = {'yes': True, 'no': False}.get(washroom)
+    return filters
+
+
+def rooms_with_occupancy(floor=None, washroom=None, min_vacancy=None):
+    """Rooms annotated with occupied/vacancy from the maintained occupied_count column, no join"""
+    rooms = Room.objects.annotate(
+        occupied=F('occupied_count'),
+        vacancy=F('capacity') - F('occupied_count'),
+    )
+    if floor is not None:
+        rooms = rooms.filter(floor=floor)
+    if washroom is not None:
+        rooms = rooms.filter(has_attached_washroom=washroom)
+    if min_vacancy is not None:
+        rooms = rooms.filter(vacancy__gte=min_vacancy)
+    return rooms.order_by('floor', 'room_number')
+
+
+AVAILABILITY_FIELDS = ('id', 'floor', 'room_number', 'capacity', 'occupied', 'vacancy', 'has_attached_washroom')
+
+
+def _group_floors(rows):
+    matrix = []
+    for floor_number, rooms in groupby(rows, key=itemgetter('floor')):
+        rooms = [
+            dict(room, has_washroom="Yes" if room['has_attached_washroom'] else "No")
+            for room in rooms
+        ]
+        matrix.append({
+            'floor': floor_number,
+            'rooms': rooms,
+            'capacity': sum(room['capacity'] for room in rooms),
+            'occupied': sum(room['occupied'] for room in rooms),
+            'vacancy': sum(room['vacancy'] for room in rooms),
+        })
+    return matrix
+
+
+def availability_matrix(floor=None, washroom=None, min_vacancy=None):
+    """Floor -> rooms matrix for the availability pages; always a single query"""
+    return _group_floors(rooms_with_occupancy(floor, washroom, min_vacancy).values(*AVAILABILITY_FIELDS))
+
+
+async def aavailability_matrix(floor=None, washroom=None, min_vacancy=None):
+    """availability_matrix() for async views, reading the rows with async iteration"""
+    rows = [row async for row in rooms_with_occupancy(floor, washroom, min_vacancy).values(*AVAILABILITY_FIELDS)]
+    return _group_floors(rows)
+
+
+def availability_context(params, show_all=False):
+    """Template context of room_availability.html; the matrix is only built once 'view' is submitted"""
+    filters = parse_availability_filters(params)
+    view_triggered = show_all or 'view' in params
+    floors = availability_matrix(**filters) if view_triggered else []
+    return {
+        'all_floors': Room.objects.values_list('floor', flat=True).distinct().order_by('floor'),
+        'selected_floor': filters['floor'],
+        'filters': filters,
+        'floors': floors,
+        'room_data': [room for floor in floors for room in floor['rooms']],
+        'view_triggered': view_triggered,
+    }
+
+
+def room_details(room_id):
+    """(room, members with balances) for the room filter page; (None, []) for an unknown room"""
+    room = Room.objects.filter(pk=room_id).first() if room_id else None
+    if room is None:
+        return None, []
+    return room, Register.objects.filter(room=room).with_balances().order_by('sur_name', 'first_name')
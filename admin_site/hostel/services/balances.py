@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from hostel.models import RENT_CYCLE_DAYS, Register
+
+# Most members one batch lookup may ask for
+BATCH_LIMIT = 500
+
+
+def member_balance(member_id):
+    """Current balance of one member in a single query, or None if there is no such member"""
+    return Register.objects.filter(pk=member_id).with_balances().values_list('balance', flat=True).first()
+
+
+async def amember_balance(member_id):
+    """member_balance() for async views"""
+    return await Register.objects.filter(pk=member_id).with_balances().values_list('balance', flat=True).afirst()
+
+
+def balances_for(member_ids=None, room_id=None):
+    """Balance, payment and rent-cycle details of the given members, or of a room's active members.
+
+    One with_balances() query whatever the number of members. Returns (rows, missing_ids).
+    """
+    members = Register.objects.all()
+    if room_id is not None:
+        members = members.filter(room_id=room_id, is_active=True)
+    if member_ids is not None:
+        members = members.filter(pk__in=member_ids)
+    rows = []
+    for row in members.with_balances().order_by('sur_name', 'first_name').values(
+        'id', 'first_name', 'sur_name', 'room__room_number', 'is_active', 'joined_date', 'total_rent',
+        'last_payment_date', 'rent_cycles', 'billed_cycles', 'expected_total', 'paid_total', 'balance',
+    ):
+        rows.append({
+            'id': row['id'],
+            'name': f"{row['sur_name']} {row['first_name']}",
+            'room': row['room__room_number'],
+            'active': row['is_active'],
+            'balance': row['balance'],
+            'expected': row['expected_total'],
+            'paid': row['paid_total'],
+            'last_payment_date': row['last_payment_date'],
+            'monthly_rent': row['total_rent'],
+            'rent_cycles': row['rent_cycles'],
+            'billed_cycles': row['billed_cycles'],
+            'next_cycle_start': row['joined_date'] + timedelta(days=RENT_CYCLE_DAYS * row['rent_cycles']),
+        })
+    found = {row['id'] for row in rows}
+    missing = [pk for pk in member_ids or [] if pk not in found]
+    return rows, missing
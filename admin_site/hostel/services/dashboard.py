@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+
+from hostel.models import Payment, Register, Room
+
+DASHBOARD_CACHE_KEY = 'hostel:dashboard-stats:{date}'
+
+# Recent-activity feed on the admin index: page size and the most entries ever paged through
+ACTIVITY_PAGE_SIZE = 10
+ACTIVITY_LIMIT = 100
+
+
+def _cache_key(today=None):
+    return DASHBOARD_CACHE_KEY.format(date=(today or now().date()).isoformat())
+
+
+def room_totals():
+    """Aggregate expressions of the room and bed counts, read from the maintained occupied_count"""
+    return {
+        'total_rooms': Count('id'),
+        'total_beds': Coalesce(Sum('capacity'), 0),
+        'occupied_beds': Coalesce(Sum('occupied_count'), 0),
+        'vacant_rooms': Count('id', filter=Q(occupied_count=0)),
+    }
+
+
+def compute_dashboard_stats(today=None):
+    """Hostel summary figures from one Room aggregate and one Register aggregate"""
+    today = today or now().date()
+    rooms = Room.objects.aggregate(**room_totals())
+
+    money = DecimalField(max_digits=12, decimal_places=2)
+    paid_today = (
+        Payment.objects.filter(member=OuterRef('pk'), payment_date=today)
+        .order_by()
+        .values('member')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    members = (
+        Register.objects.with_balances()
+        .annotate(paid_today=Subquery(paid_today, output_field=money))
+        .aggregate(
+            total_members=Count('id'),
+            active_members=Count('id', filter=Q(is_active=True)),
+            outstanding_dues=Coalesce(Sum('balance', filter=Q(is_active=True, balance__gt=0)), 0, output_field=money),
+            collected_today=Coalesce(Sum('paid_today'), 0, output_field=money),
+        )
+    )
+
+    return {
+        **rooms,
+        **members,
+        'free_beds': rooms['total_beds'] - rooms['occupied_beds'],
+    }
+
+
+def dashboard_stats():
+    """Cached dashboard figures; dropped by the model signals whenever the data changes"""
+    key = _cache_key()
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats()
+        cache.set(key, stats, getattr(settings, 'HOSTEL_DASHBOARD_CACHE_TIMEOUT', 300))
+    return stats
+
+
+def invalidate_dashboard_stats():
+    cache.delete(_cache_key())
@@ -0,0 +1,92 @@
+from django.db import transaction
+from django.db.models import Count, DecimalField, Min, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+
+from hostel.models import FloorDues, Register, Room, RoomDues
+
+DUES_FIELDS = ('active_members', 'expected_rent', 'collected', 'outstanding')
+
+
+def refresh_dues(room_ids=None, today=None):
+    """Recompute RoomDues for the given rooms (all when None) and FloorDues for their floors.
+
+    One grouped Register query for the rooms, one upsert, one grouped RoomDues query for the
+    floors and one more upsert, whatever the number of members.
+    """
+    today = today or now().date()
+    rooms = Room.objects.all() if room_ids is None else Room.objects.filter(pk__in=room_ids)
+    money = DecimalField(max_digits=12, decimal_places=2)
+    zero = {'active_members': 0, 'expected_rent': 0, 'collected': 0, 'outstanding': 0}
+
+    totals = {
+        row.pop('room_id'): row
+        for row in Register.objects.filter(is_active=True, room__in=rooms)
+        .with_balances()
+        .order_by()
+        .values('room_id')
+        .annotate(
+            active_members=Count('id'),
+            expected_rent=Sum('expected_total'),
+            collected=Sum('paid_total'),
+            outstanding=Coalesce(Sum('balance', filter=Q(balance__gt=0)), 0, output_field=money),
+        )
+    }
+    room_rows = [
+        RoomDues(room_id=pk, floor=floor, as_of=today, **totals.get(pk, zero))
+        for pk, floor in rooms.values_list('pk', 'floor')
+    ]
+    floors = {row.floor for row in room_rows}
+
+    with transaction.atomic():
+        RoomDues.objects.bulk_create(
+            room_rows, update_conflicts=True, unique_fields=['room'], update_fields=['floor', *DUES_FIELDS, 'as_of'],
+        )
+        floor_rows = [
+            FloorDues(**row)
+            for row in RoomDues.objects.filter(floor__in=floors)
+            .order_by()
+            .values('floor')
+            .annotate(
+                rooms=Count('room'),
+                active_members=Sum('active_members'),
+                expected_rent=Sum('expected_rent'),
+                collected=Sum('collected'),
+                outstanding=Sum('outstanding'),
+                as_of=Min('as_of'),
+            )
+        ]
+        FloorDues.objects.bulk_create(
+            floor_rows, update_conflicts=True, unique_fields=['floor'],
+            update_fields=['rooms', *DUES_FIELDS, 'as_of'],
+        )
+        if room_ids is None:
+            FloorDues.objects.exclude(floor__in=floors).delete()
+    return len(room_rows), len(floor_rows)
+
+
+def refresh_member_rooms(member_ids):
+    """Refresh the dues of the rooms the given members currently live in"""
+    room_ids = set(
+        Register.objects.filter(pk__in=member_ids, room__isnull=False).values_list('room_id', flat=True)
+    )
+    if room_ids:
+        refresh_dues(room_ids)
+
+
+def floor_dues(today=None):
+    """FloorDues rows by floor; rebuilt first if missing or computed before today (rent accrues daily)"""
+    today = today or now().date()
+    floors = list(FloorDues.objects.order_by('floor'))
+    if not floors or any(row.as_of < today for row in floors):
+        refresh_dues(today=today)
+        floors = list(FloorDues.objects.order_by('floor'))
+    return floors
+
+
+def rooms_with_dues(floor=None):
+    """RoomDues rows that have outstanding rent, by room number"""
+    rooms = RoomDues.objects.filter(outstanding__gt=0).select_related('room').order_by('room__room_number')
+    if floor:
+        rooms = rooms.filter(floor=floor)
+    return rooms
@@ -0,0 +1,119 @@
+import csv
+from datetime import date
+
+from django.http import StreamingHttpResponse
+
+from hostel.models import Payment, Register
+
+EXPORT_CHUNK_SIZE = 2000
+
+PAYMENT_COLUMNS = [
+    ('Payment ID', 'id'),
+    ('Date', 'payment_date'),
+    ('Member ID', 'member_id'),
+    ('Surname', 'member__sur_name'),
+    ('First Name', 'member__first_name'),
+    ('Room', 'member__room__room_number'),
+    ('Floor', 'member__room__floor'),
+    ('Amount', 'amount'),
+    ('Notes', 'notes'),
+]
+
+MEMBER_COLUMNS = [
+    ('Member ID', 'id'),
+    ('Surname', 'sur_name'),
+    ('First Name', 'first_name'),
+    ('Contact', 'contact_number'),
+    ('Room', 'room__room_number'),
+    ('Floor', 'room__floor'),
+    ('Active', 'is_active'),
+    ('Status', 'payment_status'),
+    ('Joined', 'joined_date'),
+    ('Rent', 'total_rent'),
+    ('Cycles', 'rent_cycles'),
+    ('Expected', 'expected_total'),
+    ('Paid', 'paid_total'),
+    ('Balance', 'balance'),
+]
+
+
+class Echo:
+    """File-like object whose write() hands the line straight back to the generator"""
+
+    def write(self, value):
+        return value
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def parse_export_filters(params):
+    """date_from / date_to (YYYY-MM-DD), floor and payment status from a GET dict"""
+    try:
+        floor = int(params.get('floor'))
+    except (TypeError, ValueError):
+        floor = None
+    status = params.get('status')
+    return {
+        'date_from': _parse_date(params.get('date_from')),
+        'date_to': _parse_date(params.get('date_to')),
+        'floor': floor,
+        'status': status if status in ('Paid', 'Unpaid') else None,
+    }
+
+
+def filter_payments(queryset=None, date_from=None, date_to=None, floor=None, status=None):
+    payments = Payment.objects.all() if queryset is None else queryset
+    if date_from:
+        payments = payments.filter(payment_date__gte=date_from)
+    if date_to:
+        payments = payments.filter(payment_date__lte=date_to)
+    if floor is not None:
+        payments = payments.filter(member__room__floor=floor)
+    if status:
+        payments = payments.filter(member__payment_status=status)
+    return payments
+
+
+def filter_members(queryset=None, floor=None, status=None, **date_filters):
+    members = Register.objects.all() if queryset is None else queryset
+    if floor is not None:
+        members = members.filter(room__floor=floor)
+    if status:
+        members = members.filter(payment_status=status)
+    return members
+
+
+def _rows(queryset, columns):
+    fields = [field for _, field in columns]
+    yield [label for label, _ in columns]
+    if not queryset.ordered:
+        queryset = queryset.order_by('pk')
+    yield from queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def payment_rows(queryset, archived=None):
+    """Rows of the payments in queryset, merged in date order with those of an ArchivedPayment queryset"""
+    if archived is None:
+        return _rows(queryset, PAYMENT_COLUMNS)
+    fields = [field for _, field in PAYMENT_COLUMNS]
+    merged = queryset.order_by().values_list(*fields).union(archived.order_by().values_list(*fields), all=True)
+    return _rows(merged.order_by('payment_date', 'id'), PAYMENT_COLUMNS)
+
+
+def member_rows(queryset):
+    if 'balance' not in queryset.query.annotations:
+        queryset = queryset.with_balances()
+    return _rows(queryset, MEMBER_COLUMNS)
+
+
+def stream_csv(filename, rows):
+    """Stream rows as CSV; nothing beyond one fetched chunk is held in memory"""
+    writer = csv.writer(Echo())
+    response = StreamingHttpResponse((writer.writerow(row) for row in rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,180 @@
+import csv
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.timezone import now
+
+from hostel.models import Payment, Register
+from hostel.services.dashboard import invalidate_dashboard_stats
+from hostel.services.dues import refresh_member_rooms
+from hostel.services.live import publish_changes
+from hostel.services.versions import bump
+
+IMPORT_BATCH_SIZE = 1000
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y')
+
+# Any one of these identifies the member; checked in this order
+MEMBER_KEYS = ('member_id', 'aadhar', 'contact', 'room')
+
+
+def _digits(value):
+    return "".join(ch for ch in (value or "") if ch.isdigit())
+
+
+def read_payment_rows(lines):
+    """Yield (line_number, row) from CSV lines with lowercased, trimmed headers and values"""
+    reader = csv.DictReader(lines)
+    reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames or []]
+    for row in reader:
+        yield reader.line_num, {key: (value or "").strip() for key, value in row.items() if key}
+
+
+def _parse_date(value):
+    if not value:
+        return now().date()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised date '{value}'")
+
+
+def _parse_amount(value):
+    try:
+        amount = Decimal(value.replace(',', ''))
+    except (InvalidOperation, AttributeError):
+        raise ValueError(f"invalid amount '{value}'")
+    if amount < 0 or amount != amount.to_integral_value():
+        raise ValueError(f"amount must be a whole, non-negative number, got '{value}'")
+    return int(amount)
+
+
+def _member_index(rows):
+    """Resolve every identifier used in the file with a single Register query"""
+    ids, aadhars, contacts, rooms = set(), set(), set(), set()
+    for _, row in rows:
+        if row.get('member_id', '').isdigit():
+            ids.add(int(row['member_id']))
+        if _digits(row.get('aadhar')):
+            aadhars.add(_digits(row['aadhar']))
+        if _digits(row.get('contact')):
+            contacts.update({row['contact'], _digits(row['contact'])})
+        if row.get('room'):
+            rooms.add(row['room'])
+
+    members = Register.objects.filter(
+        Q(pk__in=ids) | Q(aadhar_number__in=aadhars) | Q(contact_number__in=contacts)
+        | Q(room__room_number__in=rooms, is_active=True)
+    ).select_related('room').only('id', 'aadhar_number', 'contact_number', 'is_active', 'room__room_number')
+
+    index = {key: {} for key in MEMBER_KEYS}
+    for member in members:
+        index['member_id'][member.pk] = [member]
+        index['aadhar'].setdefault(_digits(member.aadhar_number), []).append(member)
+        index['contact'].setdefault(_digits(member.contact_number), []).append(member)
+        if member.is_active and member.room:
+            index['room'].setdefault(member.room.room_number, []).append(member)
+    return index
+
+
+def _resolve(row, index):
+    for key in MEMBER_KEYS:
+        value = row.get(key)
+        if not value:
+            continue
+        lookup = int(value) if key == 'member_id' and value.isdigit() else value
+        if key in ('aadhar', 'contact'):
+            lookup = _digits(value)
+        matches = index[key].get(lookup, [])
+        # Prefer active members when an old, vacated record shares the identifier
+        active = [m for m in matches if m.is_active] or matches
+        if len(active) == 1:
+            return active[0]
+        if len(active) > 1:
+            raise ValueError(f"{key} '{value}' matches {len(active)} members")
+        raise ValueError(f"no member found for {key} '{value}'")
+    raise ValueError(f"row needs one of: {', '.join(MEMBER_KEYS)}")
+
+
+def _payment_key(member_id, amount, payment_date, notes):
+    return member_id, amount, payment_date, notes or None
+
+
+def _already_recorded(payments):
+    """Drop payments the ledger already holds, so re-importing a file posts nothing twice.
+
+    Matched on (member, amount, date, notes) and counted: a file with the same payment twice
+    against one recorded copy still imports the second. Returns (new payments, skipped count).
+    """
+    if not payments:
+        return payments, 0
+    recorded = Counter(
+        _payment_key(*row)
+        for row in Payment.objects.filter(
+            member_id__in={payment.member_id for payment in payments},
+            payment_date__in={payment.payment_date for payment in payments},
+        ).values_list('member_id', 'amount', 'payment_date', 'notes')
+    )
+    new = []
+    for payment in payments:
+        key = _payment_key(payment.member_id, payment.amount, payment.payment_date, payment.notes)
+        if recorded[key]:
+            recorded[key] -= 1
+        else:
+            new.append(payment)
+    return new, len(payments) - len(new)
+
+
+def _changed(member_ids):
+    bump(*(f'member:{pk}' for pk in member_ids))
+    publish_changes(member_ids=member_ids)
+
+
+def import_payments(rows, dry_run=False):
+    """Validate a whole batch of parsed rows, then bulk-insert it and refresh the affected ledgers.
+
+    Nothing is written if any row fails. Rows matching a payment already recorded are skipped.
+    Returns {'created', 'skipped', 'members', 'total', 'errors'}.
+    """
+    rows = list(rows)
+    index = _member_index(rows)
+
+    payments, errors = [], []
+    for line, row in rows:
+        try:
+            member = _resolve(row, index)
+            payments.append(Payment(
+                member=member,
+                amount=_parse_amount(row.get('amount')),
+                payment_date=_parse_date(row.get('date')),
+                notes=row.get('notes') or None,
+            ))
+        except ValueError as e:
+            errors.append(f"Line {line}: {e}")
+
+    payments, skipped = _already_recorded(payments) if not errors else (payments, 0)
+    member_ids = {payment.member_id for payment in payments}
+    result = {
+        'created': 0,
+        'skipped': skipped,
+        'members': len(member_ids),
+        'total': sum(payment.amount for payment in payments),
+        'errors': errors,
+    }
+    if errors or dry_run or not payments:
+        return result
+
+    with transaction.atomic():
+        Payment.objects.bulk_create(payments, batch_size=IMPORT_BATCH_SIZE)
+        Register.objects.filter(pk__in=member_ids).refresh_ledger()
+        # bulk_create sends no post_save, so drop the dashboard figures and room dues, bump the
+        # versions and publish the new balances ourselves
+        transaction.on_commit(invalidate_dashboard_stats)
+        transaction.on_commit(lambda: refresh_member_rooms(member_ids))
+        transaction.on_commit(lambda: _changed(member_ids))
+    result['created'] = len(payments)
+    return result
@@ -0,0 +1,149 @@
+"""Live updates for open dashboards: model signals publish compact deltas, the SSE view streams them.
+
+Events are dicts with a 'type':
+    {'type': 'room', 'id', 'room_number', 'occupied', 'capacity', 'vacancy'}
+    {'type': 'member', 'id', 'room_id', 'paid', 'balance'}
+
+The broker is chosen by HOSTEL_LIVE_BACKEND (a dotted path). LocalBroker only reaches subscribers in
+the process that made the write; with several server processes use CacheBroker on a shared cache
+(HOSTEL_CACHE=file or db).
+
+The stream needs an ASGI server: under WSGI each open stream would hold a worker thread. Pages only
+include live_updates.js when streams_live() says so, and the view answers 204 otherwise.
+"""
+import asyncio
+import itertools
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import F
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+
+from hostel.models import Register, Room
+
+# Most undelivered events kept for one slow subscriber; older ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 200
+
+
+class LocalBroker:
+    """In-process pub/sub: one asyncio queue per subscriber, fed from any thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+
+    @property
+    def listening(self):
+        return bool(self._subscribers)
+
+    def publish(self, events):
+        with self._lock:
+            subscribers = list(self._subscribers)
+            events = [{**event, 'seq': next(self._ids)} for event in events]
+        for loop, queue in subscribers:
+            for event in events:
+                loop.call_soon_threadsafe(self._put, queue, event)
+
+    @staticmethod
+    def _put(queue, event):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    async def subscribe(self, timeout):
+        """Yield events as they are published, or None after `timeout` seconds of silence"""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(SUBSCRIBER_QUEUE_SIZE))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), timeout)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+
+class CacheBroker:
+    """Pub/sub through the Django cache, so every process sharing it sees every write.
+
+    Events are stored under a sequence number that subscribers poll every POLL_INTERVAL seconds.
+    """
+
+    SEQ_KEY = 'hostel:live:seq'
+    EVENT_KEY = 'hostel:live:event:{seq}'
+    # Seconds an event stays readable; a subscriber further behind than that skips it
+    EVENT_TIMEOUT = 60
+    POLL_INTERVAL = 1
+    # Other processes' subscribers can't be seen from here
+    listening = True
+
+    def publish(self, events):
+        cache.add(self.SEQ_KEY, 0, None)
+        for event in events:
+            seq = cache.incr(self.SEQ_KEY)
+            cache.set(self.EVENT_KEY.format(seq=seq), {**event, 'seq': seq}, self.EVENT_TIMEOUT)
+
+    async def subscribe(self, timeout):
+        last = await cache.aget(self.SEQ_KEY, 0)
+        idle = 0
+        while True:
+            current = await cache.aget(self.SEQ_KEY, 0)
+            if current > last:
+                keys = [self.EVENT_KEY.format(seq=seq) for seq in range(last + 1, current + 1)]
+                found = await cache.aget_many(keys)
+                last = current
+                for key in keys:
+                    if key in found:
+                        idle = 0
+                        yield found[key]
+                continue
+            await asyncio.sleep(self.POLL_INTERVAL)
+            idle += self.POLL_INTERVAL
+            if idle >= timeout:
+                idle = 0
+                yield None
+
+
+broker = SimpleLazyObject(
+    lambda: import_string(getattr(settings, 'HOSTEL_LIVE_BACKEND', 'hostel.services.live.LocalBroker'))()
+)
+
+
+def streams_live(request):
+    """Whether this request is served under ASGI, where the /api/live/ stream can stay open"""
+    return isinstance(request, ASGIRequest)
+
+
+def room_events(room_ids):
+    return [
+        {'type': 'room', **room, 'vacancy': room['capacity'] - room['occupied']}
+        for room in Room.objects.filter(pk__in=room_ids).order_by('pk').values(
+            'id', 'room_number', 'capacity', occupied=F('occupied_count'),
+        )
+    ]
+
+
+def member_events(member_ids):
+    return [
+        {'type': 'member', **member}
+        for member in Register.objects.filter(pk__in=member_ids).with_balances().order_by('pk').values(
+            'id', 'room_id', 'balance', paid=F('paid_total'),
+        )
+    ]
+
+
+def publish_changes(room_ids=(), member_ids=()):
+    """Publish the current state of the given rooms and members; call it after the write commits"""
+    if not broker.listening:
+        return
+    room_ids, member_ids = set(room_ids) - {None}, set(member_ids) - {None}
+    events = (room_events(room_ids) if room_ids else []) + (member_events(member_ids) if member_ids else [])
+    if events:
+        broker.publish(events)
@@ -0,0 +1,87 @@
+"""Keyset (seek) pagination: each page filters past the previous page's last key instead of using OFFSET,
+so page 500 costs what page 1 does. Cursors are signed lists of that last key, safe to put in URLs.
+"""
+import heapq
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.core import signing
+from django.core.exceptions import BadRequest
+from django.db.models import Q
+
+CURSOR_SALT = 'hostel.pagination'
+
+
+def encode_cursor(values):
+    return signing.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values],
+                         salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor, keys):
+    try:
+        values = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise BadRequest("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise BadRequest("Invalid cursor")
+    return values
+
+
+def _seek(keys, values, descending):
+    """(k1, k2, ...) > (v1, v2, ...) spelt out as ORs, since not every backend compares rows.
+
+    The redundant k1 >= v1 in front gives the planner an index range to start from, so it
+    seeks to the page instead of scanning the index from the top.
+    """
+    lookup = 'lt' if descending else 'gt'
+    after = reduce(or_, (
+        Q(**{key: value for key, value in zip(keys[:position], values)}, **{f'{keys[position]}__{lookup}': values[position]})
+        for position in range(len(keys))
+    ))
+    return Q(**{f'{keys[0]}__{lookup}e': values[0]}) & after
+
+
+def _key(row, key):
+    if isinstance(row, dict):
+        return row[key]
+    return reduce(getattr, key.split('__'), row)
+
+
+def _paged(queryset, keys, cursor, descending):
+    if cursor:
+        queryset = queryset.filter(_seek(keys, decode_cursor(cursor, keys), descending))
+    return queryset.order_by(*(f'-{key}' if descending else key for key in keys))
+
+
+def _page(rows, keys, size):
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor([_key(rows[-1], key) for key in keys])
+
+
+def keyset_page(queryset, keys, cursor=None, size=50, descending=False):
+    """(rows, next_cursor) of the page after `cursor`, ordered by keys; the last key must be unique.
+
+    Rows may be instances or values() dicts (which must include the keys). next_cursor is None
+    on the last page. A tampered or malformed cursor raises BadRequest.
+    """
+    return _page(list(_paged(queryset, keys, cursor, descending)[:size + 1]), keys, size)
+
+
+async def akeyset_page(queryset, keys, cursor=None, size=50, descending=False):
+    """keyset_page() for async views"""
+    return _page([row async for row in _paged(queryset, keys, cursor, descending)[:size + 1]], keys, size)
+
+
+async def akeyset_union_page(querysets, keys, cursor=None, size=50, descending=False):
+    """akeyset_page() over several querysets of the same values() shape, paged as one (a table and its
+    archive); the last key must be unique across all of them.
+
+    A UNION can't be filtered past the cursor, so each queryset is seeked on its own and the pages
+    merged: one query per queryset, each reading at most size + 1 rows.
+    """
+    pages = [[row async for row in _paged(queryset, keys, cursor, descending)[:size + 1]] for queryset in querysets]
+    merged = heapq.merge(*pages, key=lambda row: [_key(row, key) for key in keys], reverse=descending)
+    return _page(list(islice(merged, size + 1)), keys, size)
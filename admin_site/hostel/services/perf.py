@@ -0,0 +1,149 @@
+import json
+import logging
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from statistics import quantiles
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+logger = logging.getLogger('hostel.perf')
+
+# Most recent request samples, newest last; shared by every thread of the process
+samples = deque(maxlen=getattr(settings, 'HOSTEL_PERF_BUFFER_SIZE', 1000))
+
+_current = ContextVar('hostel_perf_request', default=None)
+
+
+class RequestStats:
+    """SQL and template timings of one request, filled in by the execute wrapper and Template.render"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.statements = Counter()
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - started) * 1000
+            self.sql_count += 1
+            # Same statement text with different parameters is the N+1 signature
+            self.statements[sql] += 1
+
+    def duplicates(self):
+        threshold = getattr(settings, 'HOSTEL_PERF_DUPLICATE_THRESHOLD', 5)
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+    def finish(self, view, method, path, status):
+        duplicates = self.duplicates()
+        sample = {
+            'view': view,
+            'method': method,
+            'path': path,
+            'status': status,
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 2),
+            'sql_count': self.sql_count,
+            'sql_ms': round(self.sql_ms, 2),
+            'template_ms': round(self.template_ms, 2),
+            'duplicate_queries': sum(count for _, count in duplicates),
+            'duplicate_sql': duplicates[0][0][:300] if duplicates else None,
+        }
+        samples.append(sample)
+        logger.info(json.dumps(sample))
+        return sample
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper of every connection; charges the query to the request in the current context"""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def _install_wrapper(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def instrument_connections():
+    """Install record_query once on every connection, open or opened later, in whatever thread.
+
+    A single permanent wrapper, rather than one pushed and popped per request, because
+    concurrent async requests share the thread-sensitive executor's connection.
+    """
+    connection_created.connect(_install_wrapper, dispatch_uid='hostel.perf')
+    for connection in connections.all(initialized_only=True):
+        _install_wrapper(connection)
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+_original_render = Template.render
+
+
+def _timed_render(self, context):
+    stats = _current.get()
+    if stats is None:
+        return _original_render(self, context)
+    # {% include %} and {% extends %} render nested templates; only time the outermost one
+    stats._template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        stats._template_depth -= 1
+        if not stats._template_depth:
+            stats.template_ms += (time.perf_counter() - started) * 1000
+
+
+def instrument_templates():
+    Template.render = _timed_render
+
+
+def _percentile(values, pct):
+    if len(values) == 1:
+        return values[0]
+    return quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+def summarize(entries=None):
+    """Per-view latency percentiles and query counts over the buffered samples, slowest p95 first"""
+    by_view = {}
+    for sample in list(samples if entries is None else entries):
+        by_view.setdefault(sample['view'], []).append(sample)
+
+    rows = []
+    for view, entries in by_view.items():
+        total = [s['total_ms'] for s in entries]
+        queries = [s['sql_count'] for s in entries]
+        flagged = [s for s in entries if s['duplicate_queries']]
+        rows.append({
+            'view': view,
+            'requests': len(entries),
+            'p50_ms': round(_percentile(total, 50), 2),
+            'p95_ms': round(_percentile(total, 95), 2),
+            'avg_queries': round(sum(queries) / len(queries), 1),
+            'max_queries': max(queries),
+            'avg_sql_ms': round(sum(s['sql_ms'] for s in entries) / len(entries), 2),
+            'avg_template_ms': round(sum(s['template_ms'] for s in entries) / len(entries), 2),
+            'n_plus_one': len(flagged),
+            'duplicate_sql': flagged[-1]['duplicate_sql'] if flagged else None,
+        })
+    return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
@@ -0,0 +1,60 @@
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from hostel.models import MemberSearchToken, Register, Room, normalize_search_text
+
+SEARCH_LIMIT = 20
+
+# Rank bonus for a term that matches a room number rather than a member token
+ROOM_MATCH_WEIGHT = 2
+EXACT_MATCH_BONUS = 10
+
+
+def prefix_range(field, prefix):
+    """`field` starts with `prefix`, written as a range so a plain B-tree index can serve it"""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return {f'{field}__gte': prefix, f'{field}__lt': upper}
+
+
+def search_members(term, queryset=None, limit=SEARCH_LIMIT):
+    """Active members whose name, contact, Aadhaar or room number starts with every word of term"""
+    if queryset is None:
+        queryset = Register.objects.filter(is_active=True)
+    words = normalize_search_text(term).split()
+    members = queryset.select_related('room').only('id', 'first_name', 'sur_name', 'room__room_number')
+    if not words:
+        return members.order_by('sur_name', 'first_name')[:limit]
+
+    for word in words:
+        token_matches = MemberSearchToken.objects.filter(**prefix_range('token', word)).values('member_id')
+        # Words are lowercased and room numbers may not be (A101), so rooms match case-insensitively
+        members = members.filter(Q(pk__in=token_matches) | Q(room__room_number__istartswith=word))
+
+    first = words[0]
+    best_token = (
+        MemberSearchToken.objects.filter(member=OuterRef('pk'), **prefix_range('token', first))
+        .annotate(score=Case(
+            When(token=first, then=F('weight') + EXACT_MATCH_BONUS),
+            default=F('weight'),
+            output_field=IntegerField(),
+        ))
+        .order_by('-score')
+        .values('score')[:1]
+    )
+    room_score = Case(
+        When(room__room_number__iexact=first, then=Value(ROOM_MATCH_WEIGHT + EXACT_MATCH_BONUS)),
+        When(room__room_number__istartswith=first, then=Value(ROOM_MATCH_WEIGHT)),
+        default=Value(0),
+    )
+    return (
+        members.annotate(rank=Coalesce(Subquery(best_token), 0) + room_score)
+        .order_by('-rank', 'sur_name', 'first_name')[:limit]
+    )
+
+
+def search_rooms(term, limit=SEARCH_LIMIT):
+    rooms = Room.objects.only('id', 'room_number').order_by('room_number')
+    term = term.strip()
+    if term:
+        rooms = rooms.filter(room_number__istartswith=term)
+    return rooms[:limit]
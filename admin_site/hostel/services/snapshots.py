@@ -0,0 +1,157 @@
+"""Point-in-time balance and occupancy snapshots, so historical reports are indexed reads.
+
+take_snapshot() appends one BalanceSnapshot per member that is active or owes/holds money and one
+OccupancySnapshot per room; `manage.py take_snapshot` runs it nightly. compare() answers
+"what changed between these two dates" from the snapshot rows alone.
+"""
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Abs
+from django.utils.timezone import now
+
+from hostel.models import BalanceSnapshot, OccupancySnapshot, Register, Room
+
+SNAPSHOT_BATCH_SIZE = 1000
+
+# Most members listed by compare() as the largest balance changes, either way
+CHANGE_LIMIT = 50
+
+# Figures compare() reports for each day: name -> (aggregate, field, rows counted)
+BALANCE_FIGURES = {
+    'outstanding': (Sum, 'balance', Q(balance__gt=0)),
+    'paid': (Sum, 'paid', Q()),
+    'active': (Count, 'id', Q(is_active=True)),
+}
+ROOM_FIGURES = {
+    'capacity': (Sum, 'capacity', Q()),
+    'occupied': (Sum, 'occupied', Q()),
+}
+
+
+def _append(model, objs, batch_size):
+    written = 0
+    while batch := list(islice(objs, batch_size)):
+        # ignore_conflicts: a concurrent run of the same day keeps the rows that landed first
+        model.objects.bulk_create(batch, ignore_conflicts=True)
+        written += len(batch)
+    return written
+
+
+def take_snapshot(taken_on=None, batch_size=SNAPSHOT_BATCH_SIZE):
+    """Write the balance and occupancy snapshot of a day; returns (member rows, room rows) written.
+
+    Today's balances come from the maintained ledger columns. A past date recomputes them from
+    charges and payments up to that day (with today's room and active flag); occupancy is only
+    known for today, so past dates get balance rows only. A day already snapshotted is left as is.
+    """
+    today = now().date()
+    taken_on = taken_on or today
+    if taken_on > today:
+        raise ValueError("Cannot snapshot a future date")
+
+    members = rooms = 0
+    with transaction.atomic():
+        if not BalanceSnapshot.objects.filter(taken_on=taken_on).exists():
+            balances = (
+                Register.objects.filter(joined_date__lte=taken_on)
+                .with_balances(None if taken_on == today else taken_on)
+                # Vacated members who are settled up would only repeat a zero every night
+                .filter(Q(is_active=True) | ~Q(balance=0))
+                .order_by('pk')
+                .values_list('pk', 'room__room_number', 'room__floor', 'is_active', 'expected_total', 'paid_total', 'balance')
+            )
+            members = _append(BalanceSnapshot, (
+                BalanceSnapshot(
+                    taken_on=taken_on, member_id=pk, room_number=room_number or '', floor=floor,
+                    is_active=is_active, expected=expected, paid=paid, balance=balance,
+                )
+                for pk, room_number, floor, is_active, expected, paid, balance
+                in balances.iterator(chunk_size=batch_size)
+            ), batch_size)
+
+        if taken_on == today and not OccupancySnapshot.objects.filter(taken_on=taken_on).exists():
+            rooms = _append(OccupancySnapshot, (
+                OccupancySnapshot(taken_on=taken_on, room_id=pk, floor=floor, capacity=capacity, occupied=occupied)
+                for pk, floor, capacity, occupied
+                in Room.objects.order_by('pk').values_list('pk', 'floor', 'capacity', 'occupied_count')
+            ), batch_size)
+    return members, rooms
+
+
+def snapshot_dates():
+    """Days that have a balance snapshot, newest first"""
+    return list(BalanceSnapshot.objects.order_by('-taken_on').values_list('taken_on', flat=True).distinct())
+
+
+def snapshot_on(day):
+    """The latest snapshot day on or before `day`, or None"""
+    return (
+        BalanceSnapshot.objects.filter(taken_on__lte=day)
+        .order_by('-taken_on').values_list('taken_on', flat=True).first()
+    )
+
+
+def _by_day(figures, day_a, day_b):
+    """Aggregates of each figure computed separately for the two days: {'<name>_a': ..., '<name>_b': ...}"""
+    sums = {}
+    for name, (aggregate, field, condition) in figures.items():
+        for suffix, day in (('a', day_a), ('b', day_b)):
+            extra = {'default': 0} if aggregate is Sum else {}
+            sums[f'{name}_{suffix}'] = aggregate(field, filter=condition & Q(taken_on=day), **extra)
+    return sums
+
+
+def compare(day_a, day_b, limit=CHANGE_LIMIT):
+    """Balances and occupancy of two days side by side, from the snapshot tables only.
+
+    Each day is resolved to the latest snapshot on or before it. Returns None when either has
+    no snapshot yet, else a dict with the resolved 'from'/'to' days, 'totals', per-'floors' rows
+    and the 'members' whose balance changed most.
+    """
+    day_a, day_b = snapshot_on(day_a), snapshot_on(day_b)
+    if day_a is None or day_b is None:
+        return None
+
+    days = {'taken_on__in': [day_a, day_b]}
+    balances = BalanceSnapshot.objects.filter(**days)
+    sums = _by_day(BALANCE_FIGURES, day_a, day_b)
+    totals = balances.aggregate(**sums)
+    floors = {
+        row['floor']: row
+        for row in balances.exclude(floor=None).values('floor').annotate(**sums).order_by('floor')
+    }
+
+    rooms = OccupancySnapshot.objects.filter(**days)
+    sums = _by_day(ROOM_FIGURES, day_a, day_b)
+    totals.update(rooms.aggregate(**sums))
+    for row in rooms.values('floor').annotate(**sums).order_by('floor'):
+        floors.setdefault(row['floor'], {'floor': row['floor']}).update(row)
+
+    members = (
+        balances.values('member_id', 'member__sur_name', 'member__first_name')
+        .annotate(
+            balance_a=Sum('balance', filter=Q(taken_on=day_a), default=0),
+            balance_b=Sum('balance', filter=Q(taken_on=day_b), default=0),
+        )
+        .annotate(change=F('balance_b') - F('balance_a'))
+        .exclude(change=0)
+        .order_by(Abs('change').desc(), 'member_id')[:limit]
+    )
+    return {
+        'from': day_a,
+        'to': day_b,
+        'totals': totals,
+        'floors': [floors[floor] for floor in sorted(floors)],
+        'members': [
+            {
+                'id': row['member_id'],
+                'name': f"{row['member__sur_name']} {row['member__first_name']}",
+                'balance_a': row['balance_a'],
+                'balance_b': row['balance_b'],
+                'change': row['change'],
+            }
+            for row in members
+        ],
+    }
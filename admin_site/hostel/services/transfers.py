@@ -0,0 +1,110 @@
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import F
+
+from hostel.models import Register, Room, RoomTransfer, rooms_reassigned
+
+
+class RoomTransferService:
+    """The one way to change a member's room: a single transaction, locked rows, capacity
+    enforced by Room.objects.shift_occupancy() and a RoomTransfer audit row per member moved.
+
+    move(), swap() and bulk_move() all lock through _lock(), in one fixed order: every room
+    involved (target and current) by pk, then the members by pk, so concurrent transfers can't deadlock.
+    """
+
+    def __init__(self, user=None):
+        self.user = user if user is not None and user.is_authenticated else None
+
+    def move(self, member, room):
+        """Move one member into room; raises ValidationError if it is full or already theirs"""
+        with transaction.atomic():
+            current = self._lock(members=[member.pk], rooms=[room.pk])[member.pk]
+            if current['room_id'] == room.pk:
+                raise ValidationError(f"{member.full_name()} is already in Room {room.room_number}.")
+            self._save_room(member, room, current['room_id'])
+            self._audit(RoomTransfer.MOVE, [(member.pk, current['room_id'], room.pk)])
+
+    def swap(self, member, other):
+        """Exchange the rooms of two members"""
+        with transaction.atomic():
+            current = self._lock(members=[member.pk, other.pk])
+            mine, theirs = current[member.pk]['room_id'], current[other.pk]['room_id']
+            if mine == theirs:
+                raise ValidationError(f"{member.full_name()} and {other.full_name()} are already in the same room.")
+            member.swap_rooms(other)
+            self._audit(RoomTransfer.SWAP, [(member.pk, mine, theirs), (other.pk, theirs, mine)])
+
+    def bulk_move(self, members, room):
+        """Move the members that fit into room with one UPDATE; returns (moved, skipped).
+
+        Free beds are read once; active members are taken in the given order until the room
+        is full, inactive members take no bed. skipped is a list of (member, reason).
+        """
+        members = list(members)
+        moved, skipped = [], []
+        with transaction.atomic():
+            current = self._lock(members=[m.pk for m in members], rooms=[room.pk])
+            free = Room.objects.filter(pk=room.pk).values_list(F('capacity') - F('occupied_count'), flat=True).get()
+            for member in members:
+                row = current[member.pk]
+                if row['room_id'] == room.pk:
+                    skipped.append((member, f"already in Room {room.room_number}"))
+                elif row['is_active'] and free <= 0:
+                    skipped.append((member, f"Room {room.room_number} is full"))
+                else:
+                    free -= 1 if row['is_active'] else 0
+                    moved.append(member)
+            if not moved:
+                return moved, skipped
+
+            deltas = {room.pk: 0}
+            for member in moved:
+                row = current[member.pk]
+                if row['is_active']:
+                    deltas[row['room_id']] = deltas.get(row['room_id'], 0) - 1
+                    deltas[room.pk] += 1
+            Room.objects.shift_occupancy(deltas)
+            Register.objects.filter(pk__in=[m.pk for m in moved]).update(room=room)
+            self._audit(RoomTransfer.BULK_MOVE, [(m.pk, current[m.pk]['room_id'], room.pk) for m in moved])
+            for member in moved:
+                member.room = room
+            # A queryset update sends no post_save; refresh dues and the dashboard for every room touched
+            rooms_reassigned.send(sender=Register, room_ids=set(deltas) | {current[m.pk]['room_id'] for m in moved})
+        return moved, skipped
+
+    def _lock(self, members=(), rooms=()):
+        """Lock the given rooms and the members' current rooms in pk order, then the members in pk order.
+
+        Returns {member pk: {'pk', 'room_id', 'is_active'}} as read under the lock. The current
+        rooms are read before any lock is taken; if a concurrent transfer moved one of the members
+        in between, this raises ValidationError rather than take a room lock out of order.
+        """
+        members = sorted(set(members))
+        member_rows = Register.objects.filter(pk__in=members).order_by('pk').values('pk', 'room_id', 'is_active')
+        seen = {row['pk']: row['room_id'] for row in member_rows}
+        rooms = sorted({pk for pk in (*rooms, *seen.values()) if pk is not None})
+        if rooms and connection.features.has_select_for_update:
+            list(Room.objects.select_for_update().filter(pk__in=rooms).order_by('pk').values_list('pk'))
+        if not members:
+            return {}
+        current = {row['pk']: row for row in member_rows.select_for_update()}
+        if any(row['room_id'] != seen.get(pk) for pk, row in current.items()):
+            raise ValidationError("A member was moved by someone else in the meantime; please try again.")
+        return current
+
+    def _save_room(self, member, room, previous_room_id):
+        member.room = room
+        try:
+            # Register.save() moves the occupancy counters and refuses a full room
+            member.save(update_fields=['room'])
+        except ValidationError:
+            member.room_id = previous_room_id
+            raise
+
+    def _audit(self, kind, moves):
+        RoomTransfer.objects.bulk_create(
+            RoomTransfer(member_id=member_id, from_room_id=from_room, to_room_id=to_room, kind=kind,
+                         performed_by=self.user)
+            for member_id, from_room, to_room in moves
+        )
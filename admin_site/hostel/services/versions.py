@@ -0,0 +1,73 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from hostel.models import DataVersion
+
+# Write-version tokens of the data behind the AJAX endpoints. Scopes are 'rooms' (the room table),
+# 'room:<pk>' (who lives in a room) and 'member:<pk>' (a member's payments and ledger).
+# They are DataVersion rows rather than cache entries, so every worker process sees every bump.
+
+
+def _new_version():
+    # Nanosecond timestamps: unique per write and usable as Last-Modified
+    return str(time.time_ns())
+
+
+def versions(scopes):
+    """Current version of each scope, in order; one SELECT unless a scope was never written"""
+    found = dict(DataVersion.objects.filter(scope__in=scopes).values_list('scope', 'version'))
+    missing = [scope for scope in scopes if scope not in found]
+    if missing:
+        # Start a fresh version, so no client can hold a matching ETag; a concurrent reader may win the insert
+        DataVersion.objects.bulk_create(
+            [DataVersion(scope=scope, version=_new_version()) for scope in missing], ignore_conflicts=True,
+        )
+        found.update(DataVersion.objects.filter(scope__in=missing).values_list('scope', 'version'))
+    return [found[scope] for scope in scopes]
+
+
+def version(scope):
+    return versions([scope])[0]
+
+
+def bump(*scopes):
+    DataVersion.objects.bulk_create(
+        [DataVersion(scope=scope, version=_new_version()) for scope in set(scopes)],
+        update_conflicts=True, unique_fields=['scope'], update_fields=['version'],
+    )
+
+
+def versioned_json(request, scopes, build, extra=''):
+    """JSON answer with an ETag/Last-Modified taken from the scopes' versions.
+
+    build() returns (payload, status). A matching If-None-Match or If-Modified-Since gets 304
+    without calling it; otherwise the answer is served from a short-TTL cache keyed on the versions.
+    `extra` folds other inputs (e.g. today's date, for balances that accrue daily) into the ETag;
+    such answers carry no Last-Modified, since they can change without a write.
+    """
+    current = versions(scopes)
+    digest = hashlib.sha1("|".join([*scopes, *current, extra]).encode()).hexdigest()[:20]
+    etag = f'"{digest}"'
+    last_modified = max(int(v) for v in current) // 10 ** 9 if current and not extra else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        key = f'hostel:ajax:{request.path}:{digest}'
+        answer = cache.get(key)
+        if answer is None:
+            answer = build()
+            cache.set(key, answer, getattr(settings, 'HOSTEL_AJAX_CACHE_TIMEOUT', 60))
+        payload, status = answer
+        response = JsonResponse(payload, status=status, json_dumps_params={'separators': (',', ':')})
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Let the browser keep the body but revalidate every time; revalidation is the cheap 304 above
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
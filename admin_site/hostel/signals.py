@@ -0,0 +1,67 @@
+from django.db import transaction
+
+from .models import Payment, Register, Room
+from .services.dashboard import invalidate_dashboard_stats
+from .services.dues import refresh_dues, refresh_member_rooms
+from .services.live import publish_changes
+from .services.versions import bump
+
+
+def payment_deleted(sender, instance, **kwargs):
+    # Runs inside the delete's transaction, so the ledger reversal commits with it
+    Register.objects.filter(pk=instance.member_id).adjust_ledger(-instance.amount)
+
+
+def member_deleted(sender, instance, **kwargs):
+    Room.objects.shift_occupancy({instance.occupied_room_id(): -1})
+
+
+def hostel_data_changed(sender, **kwargs):
+    # Drop the cache only once the write is visible, so a concurrent reader can't re-cache stale figures
+    transaction.on_commit(invalidate_dashboard_stats)
+
+
+def dues_changed(sender, instance, **kwargs):
+    # After commit, so Payment.save()/delete have already posted the change to the member ledger
+    if isinstance(instance, Payment):
+        member_ids = {instance.member_id, getattr(instance, '_previous_member_id', None)} - {None}
+        transaction.on_commit(lambda: refresh_member_rooms(member_ids))
+        return
+    if isinstance(instance, Register):
+        room_ids = {instance.room_id, getattr(instance, '_previous_room_id', None)} - {None}
+    else:
+        room_ids = {instance.pk}
+    if room_ids:
+        transaction.on_commit(lambda: refresh_dues(room_ids))
+
+
+def rooms_reassigned(sender, room_ids, **kwargs):
+    room_ids = set(room_ids) - {None}
+    transaction.on_commit(lambda: refresh_dues(room_ids))
+    transaction.on_commit(invalidate_dashboard_stats)
+    transaction.on_commit(lambda: bump(*(f'room:{pk}' for pk in room_ids)))
+    transaction.on_commit(lambda: publish_changes(room_ids=room_ids))
+
+
+def bump_versions(sender, instance, **kwargs):
+    # Versions behind the AJAX ETags; bumped after commit so a reader can't cache the old data under the new one
+    if isinstance(instance, Payment):
+        members = {instance.member_id, getattr(instance, '_previous_member_id', None)} - {None}
+        scopes = [f'member:{pk}' for pk in members]
+    elif isinstance(instance, Register):
+        rooms = {instance.room_id, getattr(instance, '_previous_room_id', None)} - {None}
+        scopes = [f'member:{instance.pk}', *(f'room:{pk}' for pk in rooms)]
+    else:
+        scopes = ['rooms', f'room:{instance.pk}']
+    transaction.on_commit(lambda: bump(*scopes))
+
+
+def publish_live(sender, instance, **kwargs):
+    # Deltas for the SSE feed, read after commit so they carry the updated counters and ledger
+    if isinstance(instance, Payment):
+        rooms, members = (), {instance.member_id, getattr(instance, '_previous_member_id', None)}
+    elif isinstance(instance, Register):
+        rooms, members = {instance.room_id, getattr(instance, '_previous_room_id', None)}, {instance.pk}
+    else:
+        rooms, members = {instance.pk}, ()
+    transaction.on_commit(lambda: publish_changes(room_ids=rooms, member_ids=members))
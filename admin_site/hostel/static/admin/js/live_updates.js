@@ -0,0 +1,34 @@
+// Keeps rows marked data-room-id / data-member-id current from the /api/live/ event stream.
+// Cells to update carry data-field="<event key>", e.g. <td data-field="occupied">.
+document.addEventListener('DOMContentLoaded', function () {
+    const script = document.querySelector('script[data-live-url]');
+    if (!script || !window.EventSource) {
+        return;
+    }
+
+    function apply(selector, event) {
+        document.querySelectorAll(selector).forEach(function (row) {
+            row.querySelectorAll('[data-field]').forEach(function (cell) {
+                const value = event[cell.dataset.field];
+                if (value === undefined || cell.textContent.trim() === String(value)) {
+                    return;
+                }
+                cell.textContent = value;
+                if (cell.dataset.field === 'vacancy') {
+                    cell.style.color = value <= 0 ? 'red' : 'green';
+                }
+                cell.style.backgroundColor = '#fff8c5';
+            });
+        });
+    }
+
+    const source = new EventSource(script.dataset.liveUrl);
+    source.addEventListener('room', function (message) {
+        const event = JSON.parse(message.data);
+        apply(`[data-room-id="${event.id}"]`, event);
+    });
+    source.addEventListener('member', function (message) {
+        const event = JSON.parse(message.data);
+        apply(`[data-member-id="${event.id}"]`, event);
+    });
+});
@@ -1,3 +1,720 @@
+import asyncio
+import csv
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+from hostel.models import (
+    BalanceSnapshot, FloorDues, OccupancySnapshot, Payment, Register, RentCharge, Room, RoomDues, RoomTransfer,
+)
+from hostel.scripts.populate_rooms import layout_spec, run as populate_rooms
+from hostel.services import perf
+from hostel.services.archive import archive_payments
+from hostel.services.balances import BATCH_LIMIT
+from hostel.services.dues import refresh_dues
+from hostel.services.exports import MEMBER_COLUMNS, PAYMENT_COLUMNS
+from hostel.services.imports import import_payments, read_payment_rows
+from hostel.services.search import search_members, search_rooms
+from hostel.services.snapshots import take_snapshot
+from hostel.services.transfers import RoomTransferService
+
+
+def make_member(room, **kwargs):
+    defaults = {
+        'first_name': 'Test', 'sur_name': 'Member', 'contact_number': '9000000000',
+        'aadhar_number': '123412341234', 'guardian_name': 'Guardian',
+        'guardian_contact_number': '9000000001', 'job_or_study': 'Study', 'room': room,
+    }
+    defaults.update(kwargs)
+    return Register.objects.create(**defaults)
+
+
+class PaymentChangelistQueryCountTests(TestCase):
+    changelists = ['/admin/hostel/payment/', '/admin/hostel/newpaymentproxy/']
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+    def add_payments(self, count):
+        for i in range(count):
+            room = Room.objects.filter(occupied_count__lt=F('capacity')).order_by('room_number').first()
+            member = make_member(room, sur_name=f"Member{i}")
+            Payment.objects.create(member=member, amount=1000)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def test_query_count_is_flat_as_rows_grow(self):
+        self.add_payments(5)
+        small = {url: self.count_queries(url) for url in self.changelists}
+
+        self.add_payments(45)
+        for url in self.changelists:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), small[url])
+
+    def test_balance_column_matches_member_balance(self):
+        self.add_payments(3)
+        response = self.client.get('/admin/hostel/payment/')
+        for member in Register.objects.with_balances():
+            self.assertContains(response, f"Due ₹{member.balance:.2f}")
+
+
+class PaymentLedgerTests(TestCase):
+    def setUp(self):
+        self.room = Room.objects.create(room_number='T101', floor=1, capacity=2, rent=5000)
+        self.member = make_member(self.room)
+        self.other = make_member(self.room, sur_name='Other')
+
+    def ledger(self, member):
+        member.refresh_from_db()
+        return member.paid_amount, member.last_payment_date
+
+    def test_edit_posts_the_difference(self):
+        payment = Payment.objects.create(member=self.member, amount=700, payment_date=date(2026, 9, 1))
+        payment.amount = 500
+        payment.save()
+        self.assertEqual(self.ledger(self.member), (500, date(2026, 9, 1)))
+
+    def test_moving_a_payment_reverses_it_on_the_old_member(self):
+        Payment.objects.create(member=self.member, amount=300, payment_date=date(2026, 8, 1))
+        payment = Payment.objects.create(member=self.member, amount=700, payment_date=date(2026, 9, 1))
+        payment.member = self.other
+        payment.save()
+        self.assertEqual(self.ledger(self.member), (300, date(2026, 8, 1)))
+        self.assertEqual(self.ledger(self.other), (700, date(2026, 9, 1)))
+
+    def test_delete_reverses_the_payment(self):
+        Payment.objects.create(member=self.member, amount=300, payment_date=date(2026, 8, 1))
+        payment = Payment.objects.create(member=self.member, amount=700, payment_date=date(2026, 9, 1))
+        payment.delete()
+        self.assertEqual(self.ledger(self.member), (300, date(2026, 8, 1)))
+        Payment.objects.filter(member=self.member).delete()
+        self.assertEqual(self.ledger(self.member), (0, None))
+
+    def test_failed_edit_leaves_the_ledger_alone(self):
+        payment = Payment.objects.create(member=self.member, amount=700)
+        payment.amount = -500
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            payment.save()
+        self.assertEqual(self.ledger(self.member)[0], 700)
+
+
+class RoomOccupancyTests(TestCase):
+    def setUp(self):
+        self.small = Room.objects.create(room_number='T201', floor=2, capacity=1, rent=6000)
+        self.large = Room.objects.create(room_number='T202', floor=2, capacity=3, rent=4000)
+
+    def occupancy(self):
+        return dict(Room.objects.filter(pk__in=[self.small.pk, self.large.pk]).values_list('room_number', 'occupied_count'))
+
+    def test_members_fill_and_vacate_rooms(self):
+        member = make_member(self.small)
+        make_member(self.large)
+        self.assertEqual(self.occupancy(), {'T201': 1, 'T202': 1})
+        member.is_active = False
+        member.save()
+        self.assertEqual(self.occupancy(), {'T201': 0, 'T202': 1})
+
+    def test_overfill_is_refused(self):
+        make_member(self.small)
+        with self.assertRaises(ValidationError):
+            make_member(self.small, sur_name='Extra')
+        self.assertEqual(self.occupancy(), {'T201': 1, 'T202': 0})
+        self.assertEqual(Register.objects.filter(room=self.small).count(), 1)
+
+    def test_refusal_rolls_back_the_whole_shift(self):
+        make_member(self.small)
+        make_member(self.large)
+        with self.assertRaises(ValidationError), transaction.atomic():
+            Room.objects.shift_occupancy({self.large.pk: -1, self.small.pk: 1})
+        self.assertEqual(self.occupancy(), {'T201': 1, 'T202': 1})
+
+    def test_release_never_goes_below_zero(self):
+        Room.objects.shift_occupancy({self.large.pk: -1})
+        self.assertEqual(self.occupancy(), {'T201': 0, 'T202': 0})
+
+
+class RoomTransferServiceTests(TestCase):
+    def setUp(self):
+        self.full = Room.objects.create(room_number='T301', floor=3, capacity=1, rent=6000)
+        self.free = Room.objects.create(room_number='T302', floor=3, capacity=2, rent=4000)
+        self.resident = make_member(self.full, sur_name='Resident')
+        self.mover = make_member(self.free, sur_name='Mover')
+        self.service = RoomTransferService()
+
+    def occupancy(self):
+        return dict(Room.objects.filter(pk__in=[self.full.pk, self.free.pk]).values_list('room_number', 'occupied_count'))
+
+    def room_of(self, member):
+        return Register.objects.values_list('room__room_number', flat=True).get(pk=member.pk)
+
+    def test_move_updates_counts_and_audits(self):
+        self.service.move(self.resident, self.free)
+        self.assertEqual(self.occupancy(), {'T301': 0, 'T302': 2})
+        self.assertEqual(self.room_of(self.resident), 'T302')
+        transfer = RoomTransfer.objects.get()
+        self.assertEqual((transfer.kind, transfer.from_room, transfer.to_room), (RoomTransfer.MOVE, self.full, self.free))
+
+    def test_move_into_full_room_is_refused(self):
+        with self.assertRaises(ValidationError):
+            self.service.move(self.mover, self.full)
+        self.assertEqual(self.mover.room, self.free)
+        self.assertEqual(self.room_of(self.mover), 'T302')
+        self.assertEqual(self.occupancy(), {'T301': 1, 'T302': 1})
+        self.assertFalse(RoomTransfer.objects.exists())
+
+    def test_swap_of_active_members_keeps_counts(self):
+        self.service.swap(self.resident, self.mover)
+        self.assertEqual((self.room_of(self.resident), self.room_of(self.mover)), ('T302', 'T301'))
+        self.assertEqual(self.occupancy(), {'T301': 1, 'T302': 1})
+        self.assertEqual(RoomTransfer.objects.filter(kind=RoomTransfer.SWAP).count(), 2)
+
+    def test_swap_into_full_room_is_refused(self):
+        # An inactive member holds no bed, so swapping with one moves the active member's bed
+        self.resident.is_active = False
+        self.resident.save()
+        make_member(self.full, sur_name='Newcomer')
+        with self.assertRaises(ValidationError):
+            self.service.swap(self.mover, self.resident)
+        self.assertEqual((self.room_of(self.resident), self.room_of(self.mover)), ('T301', 'T302'))
+        self.assertEqual(self.occupancy(), {'T301': 1, 'T302': 1})
+        self.assertFalse(RoomTransfer.objects.exists())
+
+    def test_bulk_move_stops_at_capacity(self):
+        Room.objects.filter(pk=self.full.pk).update(capacity=2)
+        extra = make_member(self.free, sur_name='Extra')
+        moved, skipped = self.service.bulk_move([self.mover, extra], self.full)
+        self.assertEqual(moved, [self.mover])
+        self.assertEqual([member for member, reason in skipped], [extra])
+        self.assertEqual(self.occupancy(), {'T301': 2, 'T302': 1})
+        self.assertEqual(self.room_of(extra), 'T302')
+
+
+class Select2SearchTests(TestCase):
+    def setUp(self):
+        room = Room.objects.create(room_number='T401', floor=4, capacity=1, rent=5000)
+        make_member(room, sur_name='Secret', contact_number='9876543210')
+
+    def test_search_is_staff_only(self):
+        for url in ('/select2/register/?term=98765', '/select2/room/?term=T40'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_staff_can_search(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        response = self.client.get('/select2/register/?term=98765')
+        self.assertEqual([row['text'] for row in response.json()['results']], ['Secret Test | Room T401'])
+
+    def test_room_numbers_match_in_any_case(self):
+        self.assertEqual([str(m) for m in search_members('t40')], ['Secret Test | Room T401'])
+        self.assertEqual([r.room_number for r in search_rooms('t40')], ['T401'])
+
+
+class PerfMiddlewareTests(TestCase):
+    async def test_overlapping_async_requests_count_their_own_queries(self):
+        user = await User.objects.acreate_superuser('admin', 'admin@example.com', 'pw')
+        await self.async_client.aforce_login(user)
+        urls = ['/api/occupancy/', '/api/collections/today/'] * 5
+
+        perf.samples.clear()
+        for url in urls[:2]:
+            await self.async_client.get(url)
+        alone = {sample['path']: sample['sql_count'] for sample in perf.samples}
+
+        perf.samples.clear()
+        await asyncio.gather(*(self.async_client.get(url) for url in urls))
+        self.assertEqual(len(perf.samples), len(urls))
+        for sample in perf.samples:
+            self.assertEqual(sample['sql_count'], alone[sample['path']], sample['path'])
+
+
+class LiveEventsTests(TestCase):
+    async def test_stream_closes_after_max_age(self):
+        user = await User.objects.acreate_superuser('admin', 'admin@example.com', 'pw')
+        await self.async_client.aforce_login(user)
+        with self.settings(HOSTEL_LIVE_HEARTBEAT=0.01, HOSTEL_LIVE_MAX_AGE=0.05):
+            response = await self.async_client.get('/api/live/')
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+            async def read():
+                return ''.join([chunk.decode() async for chunk in response.streaming_content])
+
+            body = await asyncio.wait_for(read(), timeout=5)
+        self.assertTrue(body.startswith('retry: 3000'))
+        self.assertIn(': keep-alive', body)
+
+    def test_wsgi_gets_no_stream(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        self.assertEqual(self.client.get('/api/live/').status_code, 204)
+        response = self.client.get('/custom/balance-payment/')
+        self.assertNotContains(response, 'live_updates.js')
+
+class BulkWritePublishTests(TestCase):
+    def setUp(self):
+        room = Room.objects.create(room_number='T501', floor=5, capacity=2, rent=5000)
+        self.member = make_member(room)
+
+    def test_import_publishes_the_new_balances(self):
+        with mock.patch('hostel.services.imports.publish_changes') as publish, \
+                self.captureOnCommitCallbacks(execute=True):
+            import_payments([(2, {'member_id': str(self.member.pk), 'amount': '700'})])
+        publish.assert_called_once_with(member_ids={self.member.pk})
+
+    def test_archive_publishes_the_moved_members(self):
+        Payment.objects.create(member=self.member, amount=700)
+        with mock.patch('hostel.services.archive.publish_changes') as publish, \
+                self.captureOnCommitCallbacks(execute=True):
+            archive_payments(Payment.objects.all())
+        publish.assert_called_once_with(member_ids={self.member.pk})
+
+
+class BalancePaymentViewTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        room = Room.objects.create(room_number='T601', floor=6, capacity=2, rent=5000)
+        make_member(room, total_rent=5000)
+
+    def test_first_load_rebuilds_the_summary_before_listing_rooms(self):
+        RoomDues.objects.all().delete()
+        FloorDues.objects.all().delete()
+        response = self.client.get('/custom/balance-payment/')
+        self.assertEqual([room['room_number'] for room in response.context['room_data']], ['T601'])
+        self.assertEqual(response.context['total_due_amount'], 5000)
+
+
+class DuesSummaryTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        self.room = Room.objects.create(room_number='T611', floor=6, capacity=2, rent=5000)
+        self.other = Room.objects.create(room_number='T612', floor=6, capacity=2, rent=4000)
+        self.member = make_member(self.room, total_rent=5000)
+        make_member(self.other, sur_name='Neighbour', total_rent=4000)
+        refresh_dues()
+
+    def dues(self):
+        rooms = RoomDues.objects.filter(room__in=[self.room, self.other])
+        rooms = dict(rooms.values_list('room__room_number', 'outstanding'))
+        return rooms, FloorDues.objects.get(floor=6).outstanding
+
+    def test_payment_refreshes_room_and_floor_dues(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(member=self.member, amount=1500, payment_date=now().date())
+        self.assertEqual(self.dues(), ({'T611': 3500, 'T612': 4000}, 7500))
+
+    def test_room_move_refreshes_both_rooms(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            RoomTransferService().move(self.member, self.other)
+        self.assertEqual(self.dues(), ({'T611': 0, 'T612': 9000}, 9000))
+
+    def test_paged_totals_match_live_balances(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(member=self.member, amount=1500, payment_date=now().date())
+        balances = Register.objects.filter(is_active=True).with_balances()
+        expected = {}
+        for member in balances.select_related('room'):
+            if member.balance > 0:
+                expected[member.room.room_number] = expected.get(member.room.room_number, 0) + member.balance
+
+        pages, cursor = [], None
+        with self.settings(HOSTEL_DUES_PAGE_SIZE=1):
+            while True:
+                params = {'partial': 1, 'cursor': cursor} if cursor else {}
+                response = self.client.get('/custom/balance-payment/', params)
+                pages.append(response.context['room_data'])
+                cursor = response.context['next_cursor']
+                if not cursor:
+                    break
+        self.assertEqual(len(pages), 2)
+        rooms = [room for page in pages for room in page]
+        self.assertEqual({room['room_number']: room['outstanding'] for room in rooms}, expected)
+        for room in rooms:
+            self.assertEqual(room['outstanding'], sum(m['balance'] for m in room['members']))
+        total = self.client.get('/custom/balance-payment/').context['total_due_amount']
+        self.assertEqual(total, sum(expected.values()))
+
+class AjaxEtagTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        self.room = Room.objects.create(room_number='951', floor=9, capacity=2, rent=5000)
+        self.member = make_member(self.room, total_rent=5000)
+        self.balance_url = f'/ajax/get-balance-by-member/?member_id={self.member.pk}'
+        self.rent_url = '/get-room-rent/951/'
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_matching_etag_gets_304(self):
+        for url in (self.balance_url, self.rent_url):
+            etag = self.etag(url)
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_payment_changes_the_balance_etag(self):
+        etag = self.etag(self.balance_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(member=self.member, amount=1500, payment_date=now().date())
+        response = self.client.get(self.balance_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['balance'], '3500')
+
+    def test_room_write_changes_the_rent_etag(self):
+        etag = self.etag(self.rent_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.room.rent = 5500
+            self.room.save()
+        response = self.client.get(self.rent_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['rent'], 5500)
+
+    def test_layout_upsert_changes_the_rent_etag(self):
+        etag = self.etag(self.rent_url)
+        populate_rooms(layout_spec(floors=1, rooms_per_floor=1, prefix='9'))
+        self.assertNotEqual(self.etag(self.rent_url), etag)
+
+class BalancesViewTests(TestCase):
+    url = '/ajax/balances/'
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        self.room = Room.objects.create(room_number='T621', floor=6, capacity=3, rent=5000)
+        self.paid = make_member(self.room, sur_name='Paid', total_rent=5000)
+        self.owing = make_member(self.room, sur_name='Owing', total_rent=5000)
+        Payment.objects.create(member=self.paid, amount=5000, payment_date=now().date())
+
+    def post(self, data):
+        return self.client.post(self.url, data, content_type='application/json')
+
+    def test_balances_of_the_requested_members(self):
+        response = self.post({'member_ids': [self.paid.pk, self.owing.pk]})
+        self.assertEqual(response.status_code, 200)
+        balances = {row['name']: row['balance'] for row in response.json()['balances']}
+        self.assertEqual(balances, {'Paid Test': '0', 'Owing Test': '5000'})
+        self.assertEqual(response.json()['missing'], [])
+
+    def test_room_and_form_data(self):
+        response = self.client.post(self.url, {'room_id': self.room.pk})
+        self.assertEqual(len(response.json()['balances']), 2)
+        response = self.client.post(self.url, {'member_ids': [str(self.owing.pk)]})
+        self.assertEqual([row['id'] for row in response.json()['balances']], [self.owing.pk])
+
+    def test_unknown_ids_are_reported_missing(self):
+        response = self.post({'member_ids': [self.owing.pk, 999999]})
+        self.assertEqual([row['id'] for row in response.json()['balances']], [self.owing.pk])
+        self.assertEqual(response.json()['missing'], [999999])
+
+    def test_malformed_ids_are_rejected(self):
+        for data in (
+            {'member_ids': str(self.owing.pk)},
+            {'member_ids': {str(self.owing.pk): 1}},
+            {'member_ids': [True]},
+            {'member_ids': [1.5]},
+            {'member_ids': [str(self.owing.pk)]},
+            {'member_ids': [None]},
+            {'room_id': True},
+            {'room_id': '1'},
+            {'member_ids': list(range(BATCH_LIMIT + 1))},
+            {},
+        ):
+            with self.subTest(data=data):
+                self.assertEqual(self.post(data).status_code, 400)
+        self.assertEqual(self.client.post(self.url, {'member_ids': ['x']}).status_code, 400)
+
+class ArchiveLedgerTests(TestCase):
+    def setUp(self):
+        room = Room.objects.create(room_number='T701', floor=7, capacity=2, rent=6000)
+        self.member = make_member(room, total_rent=6000)
+        Payment.objects.create(member=self.member, amount=700, payment_date=date(2026, 9, 1))
+        Payment.objects.create(member=self.member, amount=500, payment_date=date(2026, 10, 1))
+
+    def state(self):
+        member = Register.objects.with_balances().get(pk=self.member.pk)
+        return member.paid_amount, member.last_payment_date, member.balance_snapshot, member.balance
+
+    def test_rebuild_ledger_counts_archived_payments(self):
+        before = self.state()
+        archive_payments(Payment.objects.filter(amount=700))
+        self.assertEqual(self.state(), before)
+
+        out = StringIO()
+        call_command('rebuild_ledger', '--dry-run', stdout=out)
+        self.assertIn("drift on 0", out.getvalue())
+        call_command('rebuild_ledger', stdout=StringIO())
+        self.assertEqual(self.state(), before)
+
+    def history(self, **params):
+        pages, url = [], f'/api/payments/?member={self.member.pk}'
+        for name, value in params.items():
+            url += f'&{name}={value}'
+        while url:
+            response = self.client.get(url).json()
+            pages.append([(row['date'], row['amount']) for row in response['results']])
+            url = response['next']
+        return pages
+
+    def test_archived_payments_stay_in_the_member_history(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        before = self.history()
+        archive_payments(Payment.objects.filter(amount=700))
+        self.assertFalse(Payment.objects.filter(amount=700).exists())
+        self.assertEqual(self.history(), before)
+        self.assertEqual(before, [[('2026-10-01', 500), ('2026-09-01', 700)]])
+        self.assertEqual(self.history(limit=1), [[('2026-10-01', 500)], [('2026-09-01', 700)]])
+
+    def test_archived_payments_count_in_todays_collections(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        Payment.objects.create(member=self.member, amount=300)
+        before = self.client.get('/api/collections/today/').json()
+        archive_payments(Payment.objects.filter(amount=300))
+        self.assertEqual(self.client.get('/api/collections/today/').json(), before)
+        self.assertEqual((before['total'], before['count'], len(before['payments'])), (300, 1, 1))
+
+    def test_rebuild_ledger_with_everything_archived(self):
+        before = self.state()
+        archive_payments(Payment.objects.all())
+        call_command('rebuild_ledger', stdout=StringIO())
+        self.assertEqual(self.state(), before)
+
+
+class CsvExportActionTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        room = Room.objects.create(room_number='T801', floor=8, capacity=2, rent=5000)
+        self.member = make_member(room, sur_name='Export', total_rent=5000)
+        self.payment = Payment.objects.create(member=self.member, amount=700, payment_date=date(2026, 9, 1), notes='cash')
+
+    def export(self, url, pks):
+        response = self.client.post(url, {'action': 'export_csv_action', '_selected_action': pks})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        return list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+
+    def test_payment_export(self):
+        rows = self.export('/admin/hostel/payment/', [self.payment.pk])
+        self.assertEqual(rows[0], [label for label, _ in PAYMENT_COLUMNS])
+        self.assertEqual(rows[1:], [[
+            str(self.payment.pk), '2026-09-01', str(self.member.pk), 'Export', 'Test', 'T801', '8', '700', 'cash',
+        ]])
+
+    def test_member_export_includes_balances(self):
+        rows = self.export('/admin/hostel/register/', [self.member.pk])
+        self.assertEqual(rows[0], [label for label, _ in MEMBER_COLUMNS])
+        self.assertEqual(len(rows), 2)
+        member = Register.objects.with_balances().get(pk=self.member.pk)
+        record = dict(zip(rows[0], rows[1]))
+        self.assertEqual(
+            (record['Member ID'], record['Room'], record['Paid'], record['Balance']),
+            (str(self.member.pk), 'T801', str(member.paid_total), str(member.balance)),
+        )
+
+
+
+class PaymentImportTests(TestCase):
+    CSV = (
+        "member_id,contact,amount,date,notes\n"
+        ",9111111111,700,01/09/2026,cash\n"
+        "{other},,\"1,200\",2026-09-02,\n"
+    )
+
+    def setUp(self):
+        room = Room.objects.create(room_number='T901', floor=9, capacity=2, rent=5000)
+        self.member = make_member(room, contact_number='9111111111')
+        self.other = make_member(room, sur_name='Other', contact_number='9222222222')
+
+    def run_import(self, text, **kwargs):
+        return import_payments(read_payment_rows(StringIO(text.format(other=self.other.pk))), **kwargs)
+
+    def paid(self):
+        return list(Register.objects.filter(pk__in=[self.member.pk, self.other.pk]).order_by('pk').values_list('paid_amount', flat=True))
+
+    def test_valid_rows_are_imported_and_posted_to_the_ledger(self):
+        result = self.run_import(self.CSV)
+        self.assertEqual((result['created'], result['skipped'], result['total'], result['errors']), (2, 0, 1900, []))
+        self.assertEqual(self.paid(), [700, 1200])
+        self.assertEqual(Payment.objects.get(member=self.member).payment_date, date(2026, 9, 1))
+
+    def test_reimporting_a_file_skips_the_recorded_rows(self):
+        self.run_import(self.CSV)
+        result = self.run_import(self.CSV + ",9111111111,700,01/09/2026,cash\n")
+        # The repeated row in the file is a second payment, the other two were already recorded
+        self.assertEqual((result['created'], result['skipped']), (1, 2))
+        self.assertEqual(self.paid(), [1400, 1200])
+
+    def test_malformed_rows_reject_the_whole_file(self):
+        result = self.run_import(self.CSV + ",9111111111,12.5,,\n,0000000000,100,,\n,9111111111,100,31/31/2026,\n")
+        self.assertEqual(len(result['errors']), 3)
+        self.assertEqual(result['created'], 0)
+        self.assertFalse(Payment.objects.exists())
+        self.assertEqual(self.paid(), [0, 0])
+
+    def test_upload_that_is_not_utf8_is_a_form_error(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        upload = SimpleUploadedFile('payments.csv', "contact,amount,notes\n9111111111,700,caf\xe9\n".encode('latin-1'))
+        response = self.client.post('/admin/hostel/payment/import/', {'csv_file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('csv_file', response.context['form'].errors)
+        self.assertFalse(Payment.objects.exists())
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        self.today = now().date()
+        self.room = Room.objects.create(room_number='T121', floor=1, capacity=3, rent=5000)
+        self.other = Room.objects.create(room_number='T122', floor=1, capacity=1, rent=7000)
+        self.paying = make_member(self.room, sur_name='Paying', total_rent=5000)
+        self.owing = make_member(self.other, sur_name='Owing', total_rent=7000)
+        self.settled = make_member(self.room, sur_name='Settled', total_rent=5000)
+        self.gone = make_member(self.room, sur_name='Gone', total_rent=5000)
+        # Joined 45 days ago, in their second cycle; Settled joined today
+        Register.objects.exclude(pk=self.settled.pk).filter(room__in=[self.room, self.other]).update(
+            joined_date=self.today - timedelta(days=45),
+        )
+        Payment.objects.create(member=self.paying, amount=6000, payment_date=self.today - timedelta(days=20))
+        Payment.objects.create(member=self.settled, amount=5000, payment_date=self.today)
+        Payment.objects.create(member=self.gone, amount=2000, payment_date=self.today - timedelta(days=40))
+        Register.objects.generate_charges(self.today - timedelta(days=30))
+        for member in (self.settled, self.gone):
+            member.refresh_from_db()
+            member.is_active = False
+            member.save()
+
+    def snapshot(self, day):
+        return {
+            row[0]: row[1:]
+            for row in BalanceSnapshot.objects.filter(taken_on=day).values_list(
+                'member_id', 'room_number', 'floor', 'is_active', 'expected', 'paid', 'balance',
+            )
+        }
+
+    def live(self, as_of=None):
+        return {
+            row[0]: row[1:]
+            for row in Register.objects.filter(pk__in=[self.paying.pk, self.owing.pk, self.settled.pk, self.gone.pk])
+            .with_balances(as_of)
+            .values_list('pk', 'room__room_number', 'room__floor', 'is_active', 'expected_total', 'paid_total', 'balance')
+        }
+
+    def test_todays_snapshot_matches_live_balances_and_occupancy(self):
+        take_snapshot()
+        live = self.live()
+        # The vacated member who is settled up is left out; the one who still owes is kept
+        del live[self.settled.pk]
+        self.assertEqual(self.snapshot(self.today), live)
+        self.assertEqual(live[self.gone.pk][-1], 2 * 5000 - 2000)
+
+        occupancy = dict(
+            OccupancySnapshot.objects.filter(taken_on=self.today, room__in=[self.room, self.other])
+            .values_list('room__room_number', 'occupied')
+        )
+        active = {
+            room.room_number: Register.objects.filter(room=room, is_active=True).count() for room in (self.room, self.other)
+        }
+        self.assertEqual(occupancy, active)
+        self.assertEqual(occupancy, {'T121': 1, 'T122': 1})
+
+    def test_past_snapshot_matches_historical_balances(self):
+        day = self.today - timedelta(days=10)
+        self.assertEqual(take_snapshot(day)[1], 0)
+        live = self.live(day)
+        # Joined today, so not a member yet on that day
+        del live[self.settled.pk]
+        self.assertEqual(self.snapshot(day), live)
+        self.assertEqual(live[self.paying.pk][-1], 2 * 5000 - 6000)
+
+    def test_a_day_is_snapshotted_once(self):
+        self.assertEqual(take_snapshot(), (3, OccupancySnapshot.objects.count()))
+        Payment.objects.create(member=self.owing, amount=1000, payment_date=self.today)
+        self.assertEqual(take_snapshot(), (0, 0))
+        self.assertEqual(self.snapshot(self.today)[self.owing.pk][-1], 2 * 7000)
+
+class RentChargeTests(TestCase):
+    def setUp(self):
+        room = Room.objects.create(room_number='T111', floor=1, capacity=2, rent=5000)
+        self.member = make_member(room, total_rent=5000)
+        self.today = now().date()
+        # Joined 95 days ago: cycles started on days 0, 30, 60 and 90
+        Register.objects.filter(pk=self.member.pk).update(joined_date=self.today - timedelta(days=95))
+
+    def charged(self):
+        member = Register.objects.get(pk=self.member.pk)
+        return member.charged_cycles, member.charged_amount
+
+    def test_catch_up_bills_every_missed_cycle(self):
+        self.assertEqual(Register.objects.generate_charges(self.today), (1, 4, 20000))
+        self.assertEqual(self.charged(), (4, 20000))
+        self.assertEqual(
+            list(self.member.charges.order_by('cycle_number').values_list('cycle_start', flat=True)),
+            [self.today - timedelta(days=days) for days in (95, 65, 35, 5)],
+        )
+
+    def test_generate_charges_is_idempotent(self):
+        Register.objects.generate_charges(self.today - timedelta(days=40))
+        self.assertEqual(self.charged(), (2, 10000))
+        Register.objects.generate_charges(self.today)
+        self.assertEqual(Register.objects.generate_charges(self.today), (0, 0, 0))
+        self.assertEqual(self.charged(), (4, 20000))
+        self.assertEqual(RentCharge.objects.filter(member=self.member).count(), 4)
+
+    def test_balance_is_the_same_before_and_after_billing(self):
+        Payment.objects.create(member=self.member, amount=700)
+        before = Register.objects.with_balances().get(pk=self.member.pk).balance
+        Register.objects.generate_charges(self.today)
+        self.assertEqual(Register.objects.with_balances().get(pk=self.member.pk).balance, before)
+        self.assertEqual(before, 4 * 5000 - 700)
+
+    def test_balance_as_of_today_matches_the_ledger_columns(self):
+        Register.objects.generate_charges(self.today - timedelta(days=40))
+        Payment.objects.create(member=self.member, amount=700, payment_date=self.today - timedelta(days=1))
+        columns = ('rent_cycles', 'billed_cycles', 'billed_total', 'expected_total', 'paid_total', 'balance')
+        current = Register.objects.with_balances().values(*columns).get(pk=self.member.pk)
+        historical = Register.objects.with_balances(self.today).values(*columns).get(pk=self.member.pk)
+        self.assertEqual(historical, current)
+        self.assertEqual(current['balance'], 4 * 5000 - 700)
+
+    def test_historical_balance_reads_the_charges_once(self):
+        balances = Register.objects.with_balances(self.today).values('balance')
+        self.assertEqual(str(balances.query).count('hostel_rentcharge'), 1)
+
+    def test_balance_snapshot_uses_the_billed_charges(self):
+        Register.objects.generate_charges(self.today - timedelta(days=40))
+        # The rent went up after two cycles were billed at the old rate
+        Register.objects.filter(pk=self.member.pk).update(total_rent=6000)
+        Payment.objects.create(member=self.member, amount=700, payment_date=self.today - timedelta(days=1))
+        member = Register.objects.get(pk=self.member.pk)
+        self.assertEqual(member.balance_snapshot, 2 * 5000 + 2 * 6000 - 700)
+        self.assertEqual(
+            member.balance_snapshot,
+            Register.objects.with_balances(member.last_payment_date).get(pk=member.pk).balance,
+        )
+
+        Register.objects.filter(pk=member.pk).update(balance_snapshot=0)
+        out = StringIO()
+        call_command('rebuild_ledger', '--dry-run', stdout=out)
+        self.assertIn(f"snapshot 0.00 -> {member.balance_snapshot}", out.getvalue())
+        self.assertEqual(Register.objects.get(pk=member.pk).balance_snapshot, 0)
+        call_command('rebuild_ledger', stdout=StringIO())
+        self.assertEqual(Register.objects.get(pk=member.pk).balance_snapshot, member.balance_snapshot)
 
-# Create your tests here.
+    def test_vacating_bills_the_started_cycles_and_stops_rent(self):
+        member = Register.objects.get(pk=self.member.pk)
+        member.is_active = False
+        member.save()
+        self.assertEqual(self.charged(), (4, 20000))
+        # An inactive member accrues nothing more, whatever the date
+        self.assertEqual(Register.objects.generate_charges(self.today + timedelta(days=60)), (0, 0, 0))
+        later = Register.objects.with_balances(self.today + timedelta(days=60)).get(pk=member.pk)
+        self.assertEqual(later.expected_total, 20000)
@@ -1,11 +1,29 @@
+import json
+from itertools import groupby
+
 from django.shortcuts import render, redirect
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import ValidationError
 from django.http import JsonResponse
+from django.utils.decorators import method_decorator
 from django.utils.timezone import now
-from django.db.models import Sum
+from django.views.decorators.http import require_POST
+from django_select2.views import AutoResponseView
 
-from .models import Room, Register, Payment
+from .models import ArchivedPayment, Room, Register, Payment
+from .services.availability import availability_context, room_details
+from .services.balances import BATCH_LIMIT, balances_for, member_balance
+from .services.dues import floor_dues, rooms_with_dues
+from .services.live import streams_live
+from .services.pagination import keyset_page
+from .services.search import search_members, search_rooms
+from .services.transfers import RoomTransferService
+from .services.versions import versioned_json
+from .services.exports import (
+    filter_payments, member_rows, parse_export_filters, payment_rows, stream_csv
+)
 from .forms import (
     FloorRoomForm, ChangeRoomForm, RoomSwapForm,
     NewPaymentForm, BalancePaymentForm, VacateMemberForm
@@ -13,24 +31,17 @@ from .forms import (
 
 @staff_member_required
 def room_filter_view(request):
-    floor_form = FloorRoomForm(request.GET or None)
-    room_data = None
-    members = []
-
-    if request.GET.get('floor') and request.GET.get('room'):
-        try:
-            room_data = Room.objects.get(id=request.GET['room'])
-            members = Register.objects.filter(room=room_data)
-        except Room.DoesNotExist:
-            messages.warning(request, "Selected room not found.")
+    form = FloorRoomForm(request.GET or None)
+    room_id = form.cleaned_data.get('room') if form.is_valid() else None
+    room, members = room_details(room_id)
+    if room_id and room is None:
+        messages.warning(request, "Selected room not found.")
 
-    context = {
-        'floor_form': floor_form,
-        'room_form': floor_form if request.GET.get('floor') else None,
-        'room_data': room_data,
+    return render(request, 'admin/hostel/room_filter.html', {
+        'form': form,
+        'room_obj': room,
         'members': members,
-    }
-    return render(request, 'admin/hostel/room_filter.html', context)
+    })
 
 
 @staff_member_required
@@ -63,6 +74,8 @@ def register_member(request):
             return redirect('register')
         except Room.DoesNotExist:
             messages.error(request, "Room not found.")
+        except ValidationError as e:
+            messages.error(request, e.messages[0])
 
     rooms = Room.objects.all()
     return render(request, 'admin/hostel/register_member.html', {'rooms': rooms})
@@ -76,10 +89,11 @@ def room_swap_view(request):
         if form.is_valid():
             m1 = form.cleaned_data['member1']
             m2 = form.cleaned_data['member2']
-            m1.room, m2.room = m2.room, m1.room
-            m1.save()
-            m2.save()
-            message = f"{m1.full_name()} and {m2.full_name()} have successfully swapped rooms."
+            try:
+                RoomTransferService(request.user).swap(m1, m2)
+                message = f"{m1.full_name()} and {m2.full_name()} have successfully swapped rooms."
+            except ValidationError as e:
+                messages.error(request, e.messages[0])
     else:
         form = RoomSwapForm()
 
@@ -97,9 +111,11 @@ def change_room_view(request):
         if form.is_valid():
             member = form.cleaned_data['member']
             new_room = form.cleaned_data['new_room']
-            member.room = new_room
-            member.save()
-            message = f"{member.full_name()} has been moved to Room {new_room.room_number}"
+            try:
+                RoomTransferService(request.user).move(member, new_room)
+                message = f"{member.full_name()} has been moved to Room {new_room.room_number}"
+            except ValidationError as e:
+                messages.error(request, e.messages[0])
     else:
         form = ChangeRoomForm()
 
@@ -111,11 +127,13 @@ def change_room_view(request):
 
 @staff_member_required
 def get_room_rent(request, room_id):
-    try:
-        room = Room.objects.get(room_number=room_id)
-        return JsonResponse({'rent': room.rent})
-    except Room.DoesNotExist:
-        return JsonResponse({'error': 'Room not found'}, status=404)
+    def build():
+        rent = Room.objects.filter(room_number=room_id).values_list('rent', flat=True).first()
+        if rent is None:
+            return {'error': 'Room not found'}, 404
+        return {'rent': rent}, 200
+
+    return versioned_json(request, ['rooms'], build)
 
 
 @staff_member_required
@@ -134,53 +152,84 @@ def new_payment_view(request):
     return render(request, 'admin/hostel/new_payment.html', {'form': form})
 
 
-def calculate_member_balance(member):
-    total_days = (now().date() - member.joined_date).days
-    cycles = total_days // 30 + 1
-    total_due = member.total_rent * cycles
-
-    total_paid = Payment.objects.filter(member=member).aggregate(total=Sum('amount'))['total'] or 0
-
-    return total_due - total_paid
+# The dues report pages through rooms with outstanding rent in room number order
+DUES_PAGE_KEYS = ('room__room_number', 'room_id')
 
 
 @staff_member_required
 def balance_payment_view(request):
     floor = request.GET.get('floor')
-    rooms = Room.objects.filter(floor=floor) if floor else Room.objects.all()
-
+    members = Register.objects.filter(is_active=True, room__isnull=False)
+    if floor:
+        members = members.filter(room__floor=floor)
+    members = (
+        members.with_balances()
+        .filter(balance__gt=0)
+        .select_related('room')
+        .order_by('room__room_number', 'id')
+    )
+    if request.GET.get('format') == 'csv':
+        suffix = f"-floor-{floor}" if floor else ""
+        return stream_csv(f"dues{suffix}.csv", member_rows(members))
+
+    # Room and floor totals come from the materialized summary; member rows only for this page's rooms.
+    # floor_dues() first: it rebuilds the summary when it is missing or from an earlier day
+    all_floors = floor_dues()
+    rooms, next_cursor = keyset_page(
+        rooms_with_dues(floor), DUES_PAGE_KEYS, request.GET.get('cursor'),
+        getattr(settings, 'HOSTEL_DUES_PAGE_SIZE', 25),
+    )
+    members_by_room = {
+        room_id: list(room_members)
+        for room_id, room_members in groupby(
+            members.filter(room_id__in=[dues.room_id for dues in rooms]), key=lambda m: m.room_id
+        )
+    }
     room_data = []
-    total_due_amount = 0
-
-    for room in rooms:
-        members = room.register_set.filter(is_active=True)
-        member_data = []
-        for m in members:
-            balance = calculate_member_balance(m)
-            if balance > 0:
-                member_data.append({
+    for dues in rooms:
+        room_data.append({
+            'room_number': dues.room.room_number,
+            'active_members': dues.active_members,
+            'expected': dues.expected_rent,
+            'collected': dues.collected,
+            'outstanding': dues.outstanding,
+            'members': [
+                {
+                    'id': m.pk,
                     'name': m.full_name(),
                     'contact': m.contact_number,
                     'paid': m.paid_amount,
                     'total': m.total_rent,
-                    'balance': balance,
-                })
-                total_due_amount += balance
-        if member_data:
-            room_data.append({
-                'room_number': room.room_number,
-                'members': member_data
-            })
-
-    floors = Room.objects.values_list('floor', flat=True).distinct()
+                    'balance': m.balance,
+                }
+                for m in members_by_room.get(dues.room_id, [])
+            ],
+        })
+
+    page = {'room_data': room_data, 'next_cursor': next_cursor, 'selected_floor': floor}
+    if request.GET.get('partial'):
+        # Next rooms for the "Load more" button, appended in place
+        return render(request, 'admin/hostel/_dues_rooms.html', page)
+
+    floor_totals = [row for row in all_floors if not floor or str(row.floor) == floor]
     return render(request, 'admin/hostel/balance_payment.html', {
-        'room_data': room_data,
-        'floors': sorted(set(floors)),
-        'selected_floor': floor,
-        'total_due_amount': total_due_amount,
+        **page,
+        'floors': [row.floor for row in all_floors],
+        'floor_totals': floor_totals,
+        'total_due_amount': sum(row.outstanding for row in floor_totals),
+        'live_updates': streams_live(request),
     })
 
 
+@staff_member_required
+def export_payments_view(request):
+    """CSV of payments, filtered by ?date_from=&date_to=&floor=&status="""
+    filters = parse_export_filters(request.GET)
+    # Archived history is part of the export, read through from its own table
+    archived = filter_payments(ArchivedPayment.objects.all(), **filters)
+    return stream_csv("payments.csv", payment_rows(filter_payments(**filters), archived))
+
+
 @staff_member_required
 def vacate_member_view(request):
     room_id = request.GET.get('room') or request.POST.get('room')
@@ -229,8 +278,8 @@ def vacate_member_view(request):
 
     if member_id:
         try:
-            selected_member = Register.objects.get(id=member_id)
-            balance = selected_member.get_balance()
+            selected_member = Register.objects.with_balances().get(id=member_id)
+            balance = selected_member.balance
             form.fields['balance'].initial = balance
         except Register.DoesNotExist:
             selected_member = None
@@ -245,103 +294,98 @@ def vacate_member_view(request):
 @staff_member_required
 def get_members_by_room(request):
     room_id = request.GET.get('room_id')
-    members = Register.objects.filter(room_id=room_id, is_active=True)
 
-    member_options = [{'id': member.id, 'name': member.full_name()} for member in members]
+    def build():
+        members = (
+            Register.objects.filter(room_id=room_id, is_active=True)
+            .order_by('sur_name', 'first_name')
+            .values_list('id', 'sur_name', 'first_name')
+        )
+        return {'members': [{'id': pk, 'name': f"{sur_name} {first_name}"} for pk, sur_name, first_name in members]}, 200
 
-    return JsonResponse({'members': member_options})
+    return versioned_json(request, [f'room:{room_id}'], build)
 
 
 @staff_member_required
 def get_balance_by_member(request):
     member_id = request.GET.get('member_id')
-    try:
-        member = Register.objects.get(id=member_id)
-        balance = member.get_balance()
-        return JsonResponse({'balance': balance})
-    except Register.DoesNotExist:
-        return JsonResponse({'error': 'Member not found'}, status=404)
 
+    def build():
+        balance = member_balance(member_id)
+        if balance is None:
+            return {'error': 'Member not found'}, 404
+        return {'balance': balance}, 200
 
-@staff_member_required
-def get_member_balance(request):
-    member_id = request.GET.get('member_id')
-    try:
-        member = Register.objects.get(id=member_id)
-        today = now().date()
-        days_stayed = (today - member.joined_date).days
-        rent_cycles = (days_stayed // 30) + 1
-        expected = member.total_rent * rent_cycles
-        paid = Payment.objects.filter(member=member).aggregate(total=Sum('amount'))['total'] or 0
-        balance = expected - paid
-        return JsonResponse({'balance': balance})
-    except Register.DoesNotExist:
-        return JsonResponse({'balance': 0})
-
+    # Rent accrues by date, so the day is part of the ETag as well as the member's version
+    return versioned_json(request, [f'member:{member_id}'], build, extra=now().date().isoformat())
 
-from django.contrib.admin.views.decorators import staff_member_required
-from django.shortcuts import render
-from .models import Room
 
-from django.shortcuts import render
-from hostel.models import Room, Register
-
-def room_availability_view(request):
-    print("📢 room_availability_view called")
-    all_floors = Room.objects.values_list('floor', flat=True).distinct().order_by('floor')
-    print("✅ all_floors fetched:", list(all_floors))
+BAD_IDS = 'member_ids must be a list of integers and room_id an integer'
 
-    selected_floor = request.GET.get('floor')
-    view_triggered = 'view' in request.GET
-    room_data = []
 
-    if view_triggered and selected_floor:
+@staff_member_required
+@require_POST
+def balances_view(request):
+    """POST {"member_ids": [...]} or {"room_id": n} (JSON or form data) -> every balance in one query"""
+    if request.content_type == 'application/json':
         try:
-            selected_floor = int(selected_floor)
-            rooms = Room.objects.filter(floor=selected_floor).order_by('room_number')
-            for room in rooms:
-                occupied = Register.objects.filter(room=room, is_active=True).count()
-                room_data.append({
-                    'floor': room.floor,
-                    'room_number': room.room_number,
-                    'capacity': room.capacity,
-                    'occupied': occupied,
-                    'vacancy': room.capacity - occupied,
-                    'has_washroom': "Yes" if room.has_attached_washroom else "No"
-                })
+            data = json.loads(request.body or b'{}')
         except ValueError:
-            selected_floor = None
-
-    context = {
-        'all_floors': all_floors,
-        'selected_floor': selected_floor,
-        'room_data': room_data,
-        'view_triggered': view_triggered,
-    }
-    return render(request, 'admin/hostel/room_availability.html', context)
-
-
-
+            return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'Expected a JSON object'}, status=400)
+        member_ids, room_id = data.get('member_ids'), data.get('room_id')
+        # JSON values are used as they are: no strings, floats or booleans (True is an int in Python)
+        if member_ids is not None and (
+            not isinstance(member_ids, list)
+            or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in member_ids)
+        ):
+            return JsonResponse({'error': BAD_IDS}, status=400)
+        if room_id is not None and (not isinstance(room_id, int) or isinstance(room_id, bool)):
+            return JsonResponse({'error': BAD_IDS}, status=400)
+    else:
+        member_ids, room_id = request.POST.getlist('member_ids') or None, request.POST.get('room_id')
 
+    if member_ids is not None and len(member_ids) > BATCH_LIMIT:
+        return JsonResponse({'error': f'At most {BATCH_LIMIT} members per request'}, status=400)
+    try:
+        member_ids = [int(pk) for pk in member_ids] if member_ids is not None else None
+        room_id = int(room_id) if room_id not in (None, '') else None
+    except (TypeError, ValueError):
+        return JsonResponse({'error': BAD_IDS}, status=400)
+    if member_ids is None and room_id is None:
+        return JsonResponse({'error': 'Send member_ids or room_id'}, status=400)
 
+    rows, missing = balances_for(member_ids, room_id)
+    return JsonResponse({'balances': rows, 'missing': missing}, json_dumps_params={'separators': (',', ':')})
 
 
+@staff_member_required
+def room_availability_view(request):
+    return render(request, 'admin/hostel/room_availability.html', {
+        **availability_context(request.GET),
+        'live_updates': streams_live(request),
+    })
 
 
 # ✅ Select2 Views
-from django_select2.views import AutoResponseView
 
+# The search replaces AutoResponseView's widget lookup, which was also what kept it private
+@method_decorator(staff_member_required, name='dispatch')
 class RegisterSelect2View(AutoResponseView):
-    def get_queryset(self):
-        return Register.objects.filter(is_active=True)
-
-    def filter_queryset(self, term, queryset=None, **dependent_fields):
-        return queryset.filter(sur_name__icontains=term).order_by('sur_name')
+    def get(self, request, *args, **kwargs):
+        members = search_members(request.GET.get('term', ''))
+        return JsonResponse({
+            'results': [{'id': m.id, 'text': str(m)} for m in members],
+            'more': False,
+        })
 
 
+@method_decorator(staff_member_required, name='dispatch')
 class RoomSelect2View(AutoResponseView):
-    def get_queryset(self):
-        return Room.objects.all()
-
-    def filter_queryset(self, term, queryset=None, **dependent_fields):
-        return queryset.filter(room_number__icontains=term).order_by('room_number')
+    def get(self, request, *args, **kwargs):
+        rooms = search_rooms(request.GET.get('term', ''))
+        return JsonResponse({
+            'results': [{'id': r.id, 'text': r.room_number} for r in rooms],
+            'more': False,
+        })